@@ -0,0 +1,39 @@
+# Micro-benchmark for card_counter: the old pandas df.loc lookup against the
+# compiled strategy x rank table, per card, for every strategy.
+# Run from the top of the repo: python benchmarks/bench_counting.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from blackjack.cards import RANKS
+from blackjack.counting import STRATEGY_FILE
+from blackjack.game import STRATEGIES, card_counter, create_deck
+
+df = pd.read_pickle(STRATEGY_FILE)
+
+# How card_counter used to count cards, on the old card strings
+def card_counter_df(hand, strategy):
+    return sum(list(map(lambda i: df.loc[strategy][i].item(), hand)))
+
+
+random.seed(0)
+cards = create_deck(1)[:20]
+hands = [[card] for card in cards]  # the engine counts one card at a time
+old_hands = [[RANKS[card]] for card in cards]
+
+print(f"{'Strategy':<22}{'df.loc us/card':>16}{'table us/card':>16}{'speedup':>10}")
+for strategy in STRATEGIES:
+    # both have to agree before timing them
+    assert all(card_counter_df(o, strategy) == card_counter(h, strategy) for o, h in zip(old_hands, hands))
+
+    old = min(timeit.repeat(lambda: [card_counter_df(h, strategy) for h in old_hands], number=20, repeat=3))
+    new = min(timeit.repeat(lambda: [card_counter(h, strategy) for h in hands], number=2000, repeat=3))
+    old = old/(20*len(hands))*1e6
+    new = new/(2000*len(hands))*1e6
+    print(f"{strategy:<22}{old:>16.2f}{new:>16.3f}{old/new:>9.0f}x")
@@ -0,0 +1,78 @@
+# Benchmark for hands: the old lists of card strings with hand_total and
+# check_if_ace against the Hand object that keeps its total as it goes.
+# Every hand is dealt two cards and hits like the dealer until it is over 16.
+# Run from the top of the repo: python benchmarks/bench_hand.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack.cards import RANKS
+from blackjack.game import create_deck
+from blackjack.hand import Hand
+
+
+# The old hand functions
+def deal_card(hand, deck, number_of_cards=1):
+    for _ in range(number_of_cards):
+        hand.append(deck.pop())
+    return hand
+
+def check_if_ace(hand):
+    if 'A' in hand:
+        hand[hand.index('A')] = 'A.'
+        return True
+    else:
+        return False
+
+def hand_total(hand):
+    val = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8,
+             '9': 9, '10': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 11, 'A.': 1}
+    return int(sum(val[i] for i in hand))
+
+
+def play_lists(deck):
+    hands = 0
+    while len(deck) > 12:
+        hand = deal_card([], deck, 2)
+        while True:
+            while hand_total(hand) <= 16:
+                deal_card(hand, deck)
+            if hand_total(hand) > 21 and check_if_ace(hand):
+                continue
+            break
+        hands += 1
+    return hands
+
+def play_hands(deck):
+    hands = 0
+    while len(deck) > 12:
+        hand = Hand().deal(deck, 2)
+        while True:
+            while hand.total <= 16:
+                hand.deal(deck)
+            if hand.total > 21 and hand.check_if_ace():
+                continue
+            break
+        hands += 1
+    return hands
+
+
+def hands_per_second(play, decks):
+    start = time.perf_counter()
+    hands = sum(play(list(deck)) for deck in decks)
+    return hands/(time.perf_counter() - start)
+
+
+random.seed(0)
+decks = [create_deck(6) for _ in range(300)]
+string_decks = [[RANKS[card] for card in deck] for deck in decks]
+
+before = hands_per_second(play_lists, string_decks)
+after = hands_per_second(play_hands, decks)
+print(f"lists of strings  {before:>12,.0f} hands/s")
+print(f"Hand              {after:>12,.0f} hands/s")
+print(f"speedup           {after/before:>12.1f}x")
@@ -0,0 +1,179 @@
+# Benchmark suite for the simulation hot paths. Every benchmark uses a fixed
+# seed and reports its throughput, results can be saved as a baseline and
+# later runs fail if anything got slower than the threshold allows.
+#
+# Run from the top of the repo:
+#   python benchmarks/suite.py --save          record a baseline
+#   python benchmarks/suite.py                 compare against it
+#   python benchmarks/suite.py --only shoe sweep --threshold 0.1
+
+import argparse
+import atexit
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack import game
+from blackjack.batch import play_random_shoes
+from blackjack.counting import strategy_weights
+from blackjack.hand import Hand
+from blackjack.rules import play_shoe
+from blackjack.shoes import ShoePool
+from blackjack.sweep import sweep
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STRATEGY = 'Hi-Lo (Most Common)'
+LIMIT = 16
+
+
+# Every benchmark does its work once and returns how many units it got through
+
+def bench_create_deck():
+    for _ in range(200):
+        game.create_deck(6)
+    return 200
+
+def bench_hand_total():
+    deck = game.create_deck(6)
+    hands = 0
+    for _ in range(20):
+        cards = list(deck)
+        while len(cards) > 3:
+            hand = Hand().deal(cards, 3)
+            hand.total
+            hands += 1
+    return hands
+
+def bench_card_counter():
+    deck = game.create_deck(6)
+    for _ in range(20):
+        for card in deck:
+            game.card_counter((card,), STRATEGY)
+    return 20*len(deck)
+
+def bench_player_turn():
+    deck = game.create_deck(6)
+    hands = [(Hand().deal(deck, 2), Hand().deal(deck, 2)) for _ in range(75)]
+    decisions = 0
+    for _ in range(20):
+        for true_count in (-1, 0, 1):
+            for your_hand, dealer_hand in hands:
+                game.player_turn(your_hand, LIMIT, true_count, dealer_hand)
+                decisions += 1
+    return decisions
+
+def bench_round():
+    rounds = 0
+    for _ in range(20):
+        deck = game.create_deck(6)
+        running_count = true_count = 0
+        while len(deck) >= 12:
+            result = game.blackjack(deck, LIMIT, running_count, true_count, STRATEGY)
+            running_count, true_count = result[3], result[4]
+            rounds += 1
+    return rounds
+
+def bench_shoe():
+    for _ in range(20):
+        game.play_blackjack(LIMIT, STRATEGY)
+    return 20
+
+# the pool is made once, what's timed is dealing from it
+_pool = []
+
+def bench_pool_shoe():
+    if not _pool:
+        _pool.append(ShoePool.random(100, 6, 0))
+        atexit.register(_pool[0].close)
+    for i in range(100):
+        game.play_blackjack(LIMIT, STRATEGY, _pool[0].deck(i))
+    return 100
+
+def bench_rules_shoe():
+    for _ in range(20):
+        play_shoe(STRATEGY)
+    return 20
+
+def bench_batch():
+    play_random_shoes(2000, LIMIT, strategy_weights(STRATEGY), rng=0)
+    return 2000
+
+def bench_sweep():
+    sweep(games_sim=500, seed=0, workers=1, block_size=500)
+    return 500*10  # shoes for all ten strategies
+
+
+# name: (function, unit)
+BENCHMARKS = {
+    'create_deck': (bench_create_deck, 'shoes/s'),
+    'hand_total': (bench_hand_total, 'hands/s'),
+    'card_counter': (bench_card_counter, 'cards/s'),
+    'player_turn': (bench_player_turn, 'decisions/s'),
+    'round': (bench_round, 'hands/s'),
+    'shoe': (bench_shoe, 'shoes/s'),
+    'pool_shoe': (bench_pool_shoe, 'shoes/s'),
+    'rules_shoe': (bench_rules_shoe, 'shoes/s'),
+    'batch': (bench_batch, 'shoes/s'),
+    'sweep': (bench_sweep, 'shoes/s'),
+}
+
+
+# Best throughput out of a few repeats, the same seed every time
+def measure(func, repeat=3):
+    best = 0.0
+    for _ in range(repeat):
+        random.seed(0)
+        start = time.perf_counter()
+        units = func()
+        best = max(best, units/(time.perf_counter() - start))
+    return best
+
+# Benchmarks that are slower than the baseline by more than threshold
+def regressions(results, baseline, threshold):
+    return {name: (rate, baseline[name]) for name, rate in results.items()
+            if name in baseline and rate < baseline[name]*(1 - threshold)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the simulation hot paths')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown as a fraction of the baseline (default 0.2)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        func, unit = BENCHMARKS[name]
+        results[name] = measure(func, args.repeat)
+        line = f"{name:<14}{results[name]:>16,.0f} {unit}"
+        if name in baseline:
+            line += f"   {results[name]/baseline[name] - 1:+7.1%} vs baseline"
+        print(line)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.baseline}")
+        return 0
+
+    slow = regressions(results, baseline, args.threshold)
+    for name, (rate, base) in slow.items():
+        print(f"REGRESSION {name}: {rate:,.0f} < {base:,.0f} {BENCHMARKS[name][1]}")
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+# Blackjack card counting simulator
+# The write-up lives in "Blackjack with Various Card Counting Strat.py", this
+# package holds the engine so it can be imported without running the sweep.
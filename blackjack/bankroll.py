@@ -0,0 +1,139 @@
+# Betting and bankroll simulation: sizes bets off the true count with a bet
+# ramp and turns a strategy's rounds into money, risk of ruin, hourly win
+# and drawdowns.
+#
+# Rounds come from a pool of simulated shoes (the batch engine or the full
+# rules engine). A bankroll path is a string of shoes drawn from the pool,
+# so the counts inside a shoe stay the way they were played. Each shoe is
+# boiled down to its result, its lowest and highest point and its own worst
+# drawdown once, after that every path is a few array operations over all
+# the paths at the same time.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .batch import LOSS, NO_RESULT, WIN, play_strategies
+from .shoes import create_shoes
+
+# Shoes x rounds arrays: the result of every round in units bet (3:2 for
+# a blackjack, doubled and split hands count extra), how much was bet in
+# units and the true count before the deal. Rounds a shoe didn't play have
+# nothing bet
+RoundPool = namedtuple('RoundPool', 'net wagered true_count')
+
+# Bet ramps, true count -> units bet at that count or higher.
+# Below the lowest count the minimum bet is played
+FLAT = {}
+RAMP_1_8 = {2: 2, 3: 4, 4: 6, 5: 8}
+
+
+# Pool from a batch engine result (play_shoes with record_counts=True):
+# wins pay one, losses cost one, draws push and a blackjack pays blackjack_pays
+def batch_pool(result, blackjack_pays=1.5):
+    if result.true_count is None:
+        raise ValueError("the batch result needs record_counts=True")
+    outcome = result.outcome
+    net = np.where(outcome == WIN, 1.0, np.where(outcome == LOSS, -1.0, 0.0))
+    if result.naturals is not None:
+        net[result.naturals] = blackjack_pays
+    wagered = (outcome != NO_RESULT).astype(np.float64)
+    # the count a bet is sized on is the one left by the round before
+    true_count = np.zeros_like(result.true_count)
+    true_count[..., 1:] = result.true_count[..., :-1]
+    return RoundPool(net, wagered, true_count)
+
+# Play n shoes of the write-up's game with one strategy and pool them
+def play_pool(n, limit, strategy, number_decks=6, cut=12, rng=None, blackjack_pays=1.5):
+    shoes = create_shoes(n, number_decks, rng)
+    result = play_strategies(shoes, limit, [strategy], cut, record_counts=True)[strategy]
+    return batch_pool(result, blackjack_pays)
+
+# Play n shoes with the full rules (rules.play_shoe) and pool them
+def rules_pool(n, strategy, table=None, rules=None, number_decks=6, cut=12, seed=None):
+    import random
+    from .rules import RULES, play_shoe
+    if seed is not None:
+        random.seed(seed)
+    shoes = [play_shoe(strategy, table, rules or RULES, number_decks=number_decks, cut=cut) for _ in range(n)]
+    rounds = max(shoe[3] for shoe in shoes)
+    pool = RoundPool(*(np.zeros((n, rounds)) for _ in range(3)))
+    for i, (nets, bets, counts, played) in enumerate(shoes):
+        pool.net[i, :played] = nets
+        pool.wagered[i, :played] = bets
+        pool.true_count[i, :played] = counts
+    return pool
+
+
+# Units bet at each true count
+def bet_sizes(true_count, ramp, min_bet=1.0):
+    counts = np.array(sorted(ramp), dtype=np.float64)
+    units = np.array([ramp[c] for c in sorted(ramp)] + [min_bet], dtype=np.float64)
+    step = np.searchsorted(counts, true_count, side='right') - 1
+    return units[np.where(step >= 0, step, -1)]
+
+# Every shoe of the pool played with a ramp: its result, amount bet, rounds,
+# lowest and highest point on the way (from where it started) and the worst
+# drawdown inside it
+def shoe_summary(pool, ramp, min_bet=1.0):
+    played = pool.wagered > 0
+    bets = np.where(played, bet_sizes(pool.true_count, ramp, min_bet), 0.0)
+    path = np.cumsum(bets*pool.net, axis=1)
+    start = np.zeros((len(path), 1))
+    peaks = np.maximum.accumulate(np.hstack([start, path]), axis=1)[:, 1:]
+    return {
+        'result': path[:, -1],
+        'wagered': (bets*pool.wagered).sum(axis=1),
+        'rounds': played.sum(axis=1),
+        'low': np.minimum(path.min(axis=1), 0.0),
+        'high': np.maximum(path.max(axis=1), 0.0),
+        'drawdown': np.maximum((peaks - path).max(axis=1), 0.0),
+    }
+
+
+# Simulate paths bankroll paths of hours each, rounds_per_hour rounds an
+# hour. The paths are done chunk paths at a time to keep the arrays small.
+# Returns risk of ruin (the bankroll hits zero), the expected hourly win and
+# its standard deviation, the drawdown and final bankroll percentiles.
+# Paths keep playing after they are ruined, the drawdowns and final
+# bankrolls are what an unlimited bankroll would have seen
+def simulate(pool, ramp=RAMP_1_8, bankroll=1000.0, hours=100, rounds_per_hour=100, paths=100000,
+             min_bet=1.0, percentiles=(50, 90, 95, 99), rng=None, chunk=10000):
+    rng = np.random.default_rng(rng)
+    shoe = shoe_summary(pool, ramp, min_bet)
+    rounds_per_shoe = shoe['rounds'].mean()
+    shoes_per_path = max(1, int(np.ceil(hours*rounds_per_hour/rounds_per_shoe)))
+
+    ruined = np.zeros(paths, dtype=bool)
+    drawdown = np.zeros(paths)
+    final = np.zeros(paths)
+    for first in range(0, paths, chunk):
+        size = min(chunk, paths - first)
+        picks = rng.integers(len(shoe['result']), size=(size, shoes_per_path))
+        end = np.cumsum(shoe['result'][picks], axis=1)
+        before = end - shoe['result'][picks]
+        low = before + shoe['low'][picks]
+        # highest point before each shoe starts, 0 is where the path starts
+        peak = np.maximum.accumulate(before + shoe['high'][picks], axis=1)
+        peak = np.hstack([np.zeros((size, 1)), np.maximum(peak[:, :-1], 0.0)])
+        part = slice(first, first + size)
+        ruined[part] = bankroll + low.min(axis=1) <= 0
+        drawdown[part] = np.maximum(peak - low, shoe['drawdown'][picks]).max(axis=1)
+        final[part] = bankroll + end[:, -1]
+
+    per_round = shoe['result'].sum()/shoe['rounds'].sum()
+    # shoes are independent, so the hourly variance is the per shoe one scaled up
+    shoes_per_hour = rounds_per_hour/rounds_per_shoe
+    return {
+        'risk of ruin': ruined.mean(),
+        'hourly win': per_round*rounds_per_hour,
+        'hourly sd': shoe['result'].std()*np.sqrt(shoes_per_hour),
+        'average bet': shoe['wagered'].sum()/shoe['rounds'].sum(),
+        'drawdown': dict(zip(percentiles, np.percentile(drawdown, percentiles))),
+        'final bankroll': dict(zip(percentiles, np.percentile(final, percentiles))),
+    }
+
+def print_simulation(name, summary):
+    drawdown = ', '.join(f"{p}%: {v:.0f}" for p, v in summary['drawdown'].items())
+    print(f"{name:<22}ruin {summary['risk of ruin']:7.2%}   hourly {summary['hourly win']:+7.2f} "
+          f"(sd {summary['hourly sd']:.1f})   avg bet {summary['average bet']:.2f}   drawdown {drawdown}")
@@ -0,0 +1,334 @@
+# Batch engine that plays many shoes at the same time with numpy.
+# Every shoe is a row of card ranks and all of them move through the same
+# hit/stay logic as player_turn and dealer_turn, masks keep track of which
+# shoes are dealing, which are waiting on the player and which on the dealer.
+
+from collections import namedtuple
+
+import numpy as np
+
+from . import instrument
+from .cards import ACE
+from .counting import count_table
+from .shoes import VALUES, create_shoes
+
+# Result of a round, same order as the list blackjack() returns
+WIN, LOSS, DRAW = 0, 1, 2
+# No result: the round ran out of cards or was never played
+NO_RESULT = -1
+
+# Where each shoe is in the current round
+DEAL, PLAYER, DEALER, DONE = 0, 1, 2, 3
+
+# A round needs four cards to start, smaller cuts play like this one
+MIN_CUT = 4
+
+# outcome is shoes x rounds (strategies x shoes x rounds when several
+# strategies are played), rounds is how many rounds each shoe played,
+# the counts are what blackjack() returned after each round (if recorded),
+# naturals marks the rounds won with a blackjack (recorded with the counts)
+BatchResult = namedtuple('BatchResult', 'outcome rounds running_count true_count naturals',
+                         defaults=(None,))
+
+
+# Same as true_counter but for arrays, remaining is the cards left in each shoe
+def true_counts(running_count, remaining):
+    decks = remaining//52
+    # Less than a deck left means the running count is used as is
+    return np.where(decks > 0, np.rint(running_count/np.maximum(decks, 1)), running_count)
+
+# Hit or stay for every shoe, the same choices player_turn makes
+def player_hits(total, limit, true_count, dealer_card):
+    return np.where(true_count > 0, total < limit,
+           np.where(true_count < 0, total <= limit,
+                    # neutral count, the modified basic strategy
+                    (total < 12) | ((total < 17) & (dealer_card > 6))))
+
+
+# Play every shoe (one per row, dealt left to right) until fewer than cut
+# cards are left, exactly like play_blackjack does with a single deck list.
+# weights can be one strategy or a strategies x ranks matrix, then every
+# strategy plays every shoe in lockstep and the shoes are only dealt once.
+# histogram (a histogram.CountHistogram, one row per strategy in weights)
+# gets every round's result and both ways every decision could have gone
+@instrument.probe('batch play')
+def play_shoes(shoes, limit, weights, cut=12, record_counts=False, histogram=None):
+    shoes = np.asarray(shoes)
+    weights = np.asarray(weights, dtype=np.float64)
+    single = weights.ndim == 1
+    weights = np.atleast_2d(weights)
+    strategies = len(weights)
+    shoe_count, size = shoes.shape
+    max_rounds = size//4 + 1
+
+    # One lane per strategy and shoe, each lane knows its shoe and strategy
+    n = strategies*shoe_count
+    row = np.tile(np.arange(shoe_count), strategies)
+    strat = np.repeat(np.arange(strategies), shoe_count)
+
+    # Per shoe state
+    pos = np.zeros(n, dtype=np.int64)          # next card to deal
+    phase = np.full(n, DEAL, dtype=np.int8)
+    running = np.zeros(n)
+    your_total = np.zeros(n, dtype=np.int16)
+    your_aces = np.zeros(n, dtype=np.int16)    # aces still counted as eleven
+    dealer_total = np.zeros(n, dtype=np.int16)
+    dealer_aces = np.zeros(n, dtype=np.int16)
+    up_card = np.zeros(n, dtype=np.int16)      # value of the dealer's shown card
+    hole = np.zeros(n, dtype=np.int8)          # rank of the dealer's hidden card
+    rnd = np.zeros(n, dtype=np.int64)
+    bet_count = np.zeros(n)                    # true count before the deal, for histogram
+
+    outcome = np.full((n, max_rounds), NO_RESULT, dtype=np.int8)
+    rc_log = np.zeros((n, max_rounds)) if record_counts else None
+    tc_log = np.zeros((n, max_rounds)) if record_counts else None
+    natural_log = np.zeros((n, max_rounds), dtype=bool) if record_counts else None
+    dealt = np.zeros(n, dtype=bool) if record_counts else None  # player still has the two dealt cards
+
+    # Deal the next card to the shoes in idx and add it to the running count
+    def draw(idx):
+        card = shoes[row[idx], pos[idx]]
+        pos[idx] += 1
+        running[idx] += weights[strat[idx], card]
+        return card
+
+    # Record the result of the round and see if the shoe can play another
+    def finish(idx, result, stop=False):
+        if timing:
+            instrument.count('hand', len(idx))
+        outcome[idx, rnd[idx]] = result
+        if histogram is not None:
+            histogram.add_rounds(strat[idx], bet_count[idx], your_total[idx], up_card[idx], result)
+        if record_counts:
+            rc_log[idx, rnd[idx]] = running[idx]
+            tc_log[idx, rnd[idx]] = true_counts(running[idx], size - pos[idx])
+        rnd[idx] += 1
+        out = (size - pos[idx] < max(cut, MIN_CUT)) | stop
+        phase[idx] = np.where(out, DONE, DEAL)
+
+    # Result of the round for the shoes in idx, at a player decision, if the
+    # player hits now (then plays on as the strategy says) or stays now.
+    # Plays on copies, the shoes' own state doesn't move
+    def branch(idx, hit_first):
+        p, rc = pos[idx].copy(), running[idx].copy()
+        total, aces = your_total[idx].copy(), your_aces[idx].copy()
+        result = np.full(len(idx), NO_RESULT, dtype=np.int8)
+        moving = np.arange(len(idx))
+        hit = np.full(len(idx), hit_first)
+        stays = []
+        while moving.size:
+            if stays:
+                # the same checks the player's loop makes before every move
+                moving = moving[size - p[moving] > 1]
+                natural = total[moving] == 21
+                result[moving[natural & (dealer_total[idx[moving]] < 21)]] = WIN
+                result[moving[natural & (dealer_total[idx[moving]] == 21)]] = DRAW
+                moving = moving[~natural | (dealer_total[idx[moving]] > 21)]
+                hit = player_hits(total[moving], limit, true_counts(rc[moving], size - p[moving]),
+                                  up_card[idx[moving]])
+            stays.append(moving[~hit])
+            hitting = moving[hit]
+            card = shoes[row[idx[hitting]], p[hitting]]
+            p[hitting] += 1
+            rc[hitting] += weights[strat[idx[hitting]], card]
+            total[hitting] += VALUES[card]
+            aces[hitting] += card == ACE
+            bust = total[hitting] > 21
+            soft = bust & (aces[hitting] > 0)
+            total[hitting[soft]] -= 10
+            aces[hitting[soft]] -= 1
+            result[hitting[bust & ~soft]] = LOSS
+            result[hitting[~bust & (total[hitting] == 21)]] = WIN
+            moving = hitting[soft | ~bust & (total[hitting] < 21)]
+
+        staying = np.concatenate(stays)
+        over = staying[total[staying] > 21]
+        while over.size:
+            fix = over[aces[over] > 0]
+            total[fix] -= 10
+            aces[fix] -= 1
+            over = fix[total[fix] > 21]
+        dealer, dealer_soft = dealer_total[idx].copy(), dealer_aces[idx].copy()
+        dealing = staying
+        while dealing.size:
+            low = dealer[dealing] <= 16
+            hitting = dealing[low]
+            hitting = hitting[p[hitting] < size]
+            card = shoes[row[idx[hitting]], p[hitting]]
+            p[hitting] += 1
+            dealer[hitting] += VALUES[card]
+            dealer_soft[hitting] += card == ACE
+            standing = dealing[~low]
+            total_d = dealer[standing]
+            result[standing[total_d == 21]] = LOSS
+            bust = standing[total_d > 21]
+            soft = dealer_soft[bust] > 0
+            dealer[bust[soft]] -= 10
+            dealer_soft[bust[soft]] -= 1
+            result[bust[~soft]] = WIN
+            compare = standing[total_d < 21]
+            result[compare] = np.where(dealer[compare] > total[compare], LOSS,
+                              np.where(dealer[compare] < total[compare], WIN, DRAW))
+            dealing = np.concatenate([hitting, bust[soft]])
+        return result
+
+    timing = instrument.enabled
+    while True:
+        dealing = np.flatnonzero(phase == DEAL)
+        playing = np.flatnonzero(phase == PLAYER)
+        dealers = np.flatnonzero(phase == DEALER)
+        if not (dealing.size or playing.size or dealers.size):
+            break
+
+        # Two cards each, the first dealer card is the one everyone sees
+        if dealing.size:
+            if timing:
+                instrument.start('deal')
+            if histogram is not None:
+                bet_count[dealing] = true_counts(running[dealing], size - pos[dealing])
+            cards = shoes[row[dealing][:, None], pos[dealing][:, None] + np.arange(4)]
+            pos[dealing] += 4
+            your_total[dealing] = VALUES[cards[:, 0]] + VALUES[cards[:, 1]]
+            your_aces[dealing] = (cards[:, 0] == ACE).astype(np.int16) + (cards[:, 1] == ACE)
+            dealer_total[dealing] = VALUES[cards[:, 2]] + VALUES[cards[:, 3]]
+            dealer_aces[dealing] = (cards[:, 2] == ACE).astype(np.int16) + (cards[:, 3] == ACE)
+            up_card[dealing] = VALUES[cards[:, 2]]
+            hole[dealing] = cards[:, 3]
+            if record_counts:
+                dealt[dealing] = True
+            counts = weights[strat[dealing]]
+            running[dealing] += (counts[np.arange(len(dealing)), cards[:, 0]]
+                                 + counts[np.arange(len(dealing)), cards[:, 1]]
+                                 + counts[np.arange(len(dealing)), cards[:, 2]])
+            phase[dealing] = PLAYER
+            if timing:
+                instrument.stop()
+
+        # The player's loop in blackjack(), one move per shoe
+        if playing.size:
+            if timing:
+                instrument.start('player decision')
+            empty = size - pos[playing] <= 1
+            if empty.any():
+                finish(playing[empty], NO_RESULT)
+                playing = playing[~empty]
+
+            # Blackjacks, the hidden card gets counted when it is shown
+            natural = your_total[playing] == 21
+            won = natural & (dealer_total[playing] < 21)
+            tied = natural & (dealer_total[playing] == 21)
+            shown = playing[won | tied]
+            running[shown] += weights[strat[shown], hole[shown]]
+            if record_counts:
+                # a hand that got to 21 by hitting and turning an Ace into a one isn't a natural
+                paid = playing[won & dealt[playing]]
+                natural_log[paid, rnd[paid]] = True
+            finish(playing[won], WIN)
+            finish(playing[tied], DRAW)
+            playing = playing[~(won | tied)]
+
+            tc = true_counts(running[playing], size - pos[playing])
+            hit = player_hits(your_total[playing], limit, tc, up_card[playing])
+            if histogram is not None and playing.size:
+                histogram.add_decisions(strat[playing], tc, your_total[playing], up_card[playing], hit,
+                                        branch(playing, False), branch(playing, True))
+
+            hitting = playing[hit]
+            if record_counts:
+                dealt[hitting] = False
+            card = draw(hitting)
+            your_total[hitting] += VALUES[card]
+            your_aces[hitting] += card == ACE
+            bust = your_total[hitting] > 21
+            soft = bust & (your_aces[hitting] > 0)
+            # An Ace turns into a one and the player moves again
+            your_total[hitting[soft]] -= 10
+            your_aces[hitting[soft]] -= 1
+            if timing:
+                instrument.count('soft ace', int(soft.sum()))
+            finish(hitting[bust & ~soft], LOSS)
+            finish(hitting[~bust & (your_total[hitting] == 21)], WIN)
+
+            staying = playing[~hit]
+            running[staying] += weights[strat[staying], hole[staying]]
+            # dealer_turn fixes a busted hand with an Ace before anything else
+            while True:
+                over = staying[(your_total[staying] > 21) & (your_aces[staying] > 0)]
+                if not over.size:
+                    break
+                your_total[over] -= 10
+                your_aces[over] -= 1
+            phase[staying] = DEALER
+            if timing:
+                instrument.stop()
+
+        # The dealer's loop in dealer_turn(), one card or one decision per shoe
+        if dealers.size:
+            if timing:
+                instrument.start('dealer play')
+            hitting = dealers[dealer_total[dealers] <= 16]
+            # play_blackjack would crash drawing from an empty deck,
+            # here the round just has no result and the shoe is over
+            empty = hitting[pos[hitting] >= size]
+            finish(empty, NO_RESULT, stop=True)
+            hitting = hitting[pos[hitting] < size]
+            card = draw(hitting)
+            dealer_total[hitting] += VALUES[card]
+            dealer_aces[hitting] += card == ACE
+
+            standing = dealers[dealer_total[dealers] > 16]
+            # skip the shoes that just drew, they stand on the next pass
+            standing = standing[~np.isin(standing, hitting)]
+            total = dealer_total[standing]
+            finish(standing[total == 21], LOSS)
+
+            bust = standing[total > 21]
+            soft = dealer_aces[bust] > 0
+            dealer_total[bust[soft]] -= 10
+            dealer_aces[bust[soft]] -= 1
+            if timing:
+                instrument.count('soft ace', int(soft.sum()))
+            finish(bust[~soft], WIN)
+
+            compare = standing[total < 21]
+            total, yours = dealer_total[compare], your_total[compare]
+            finish(compare[total > yours], LOSS)
+            finish(compare[total < yours], WIN)
+            finish(compare[total == yours], DRAW)
+            if timing:
+                instrument.stop()
+
+    # Split the lanes back into strategies x shoes
+    shape = (shoe_count,) if single else (strategies, shoe_count)
+    return BatchResult(outcome.reshape(shape + (max_rounds,)), rnd.reshape(shape),
+                       None if rc_log is None else rc_log.reshape(shape + (max_rounds,)),
+                       None if tc_log is None else tc_log.reshape(shape + (max_rounds,)),
+                       None if natural_log is None else natural_log.reshape(shape + (max_rounds,)))
+
+# Play the same shoes with several strategies at once (all of them by
+# default) and split the results up by strategy name
+def play_strategies(shoes, limit, strategies=None, cut=12, record_counts=False, histogram=None):
+    names, table = count_table()
+    strategies = list(names if strategies is None else strategies)
+    weights = table[[names.index(s) for s in strategies]]
+    result = play_shoes(shoes, limit, weights, cut, record_counts, histogram)
+    return {s: BatchResult(*(None if field is None else field[i] for field in result))
+            for i, s in enumerate(strategies)}
+
+
+# Shuffle n shoes and play them all
+def play_random_shoes(n, limit, weights, number_decks=6, cut=12, rng=None, record_counts=False):
+    shoes = create_shoes(n, number_decks, rng)
+    return play_shoes(shoes, limit, weights, cut, record_counts)
+
+# Wins, losses and draws per shoe, like summing the lists from play_blackjack
+def tallies(result):
+    return [(result.outcome == code).sum(axis=-1) for code in (WIN, LOSS, DRAW)]
+
+# Wins and draws in the last n rounds of each shoe, the sweep's rec_rounds
+def last_rounds(result, n):
+    cols = np.arange(result.outcome.shape[-1])
+    rounds = result.rounds[..., None]
+    window = (cols >= rounds - n) & (cols < rounds)
+    good = (result.outcome == WIN) | (result.outcome == DRAW)
+    return (good & window).sum(axis=-1)
@@ -0,0 +1,10 @@
+# Cards as small integer ranks instead of strings
+
+# Rank codes are the position in this tuple, same order as the columns of
+# the card counting table ('A.' is just an Ace that has been turned into a one)
+RANKS = ('2','3','4','5','6','7','8','9','10','J','Q','K','A')
+ACE = RANKS.index('A')
+RANK_CODE = dict({card: code for code, card in enumerate(RANKS)}, **{'A.': ACE})
+
+# Face value of every rank, an Ace counts eleven until it has to be a one
+CARD_VALUES = (2,3,4,5,6,7,8,9,10,10,10,10,11)
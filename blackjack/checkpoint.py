@@ -0,0 +1,48 @@
+# Checkpoint files for long sweeps, so a run that gets killed can carry on
+# where it stopped. A checkpoint is one .npz: the position, tallies and
+# settings as JSON plus every partial results curve as an array. It is
+# written to a temporary file and renamed over the old one, so a crash in
+# the middle of saving still leaves the previous checkpoint.
+
+import json
+import os
+
+import numpy as np
+
+from .stats import RunningStats
+
+
+# Save state (anything JSON can hold) and curves ({name: list of floats})
+def save_checkpoint(path, state, curves):
+    names = list(curves)
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        np.savez(f, state=np.array(json.dumps(dict(state, curves=names))),
+                 **{f"curve{i}": np.asarray(curves[name], dtype=np.float64) for i, name in enumerate(names)})
+    os.replace(temp, path)
+
+# The state and curves saved by save_checkpoint
+def load_checkpoint(path):
+    with np.load(path) as data:
+        state = json.loads(str(data['state']))
+        curves = {name: data[f"curve{i}"].tolist() for i, name in enumerate(state.pop('curves'))}
+    return state, curves
+
+# Settings in a checkpoint have to match the run that is resuming it
+def check_settings(state, settings):
+    if state['settings'] != settings:
+        changed = sorted(k for k in set(state['settings']) | set(settings)
+                         if state['settings'].get(k) != settings.get(k))
+        raise ValueError(f"checkpoint is for a different sweep ({', '.join(changed)} changed)")
+
+
+# RunningStats to and from the checkpoint
+def dump_stats(stats):
+    return {name: [st.count, st.mean, st.m2] for name, st in stats.items()}
+
+def load_stats(saved):
+    stats = {}
+    for name, (count, mean, m2) in saved.items():
+        stats[name] = st = RunningStats()
+        st.count, st.mean, st.m2 = count, mean, m2
+    return stats
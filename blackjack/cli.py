@@ -0,0 +1,217 @@
+# Command line entry point: python -m blackjack --help
+# Only the engine that is asked for gets imported, the scalar engine needs
+# nothing outside the standard library so short jobs start fast.
+
+import argparse
+import sys
+
+
+def parse_args(argv=None):
+    from .counting import STRATEGIES
+    parser = argparse.ArgumentParser(prog='python -m blackjack',
+                                     description='Simulate Blackjack with card counting strategies.')
+    parser.add_argument('--strategies', nargs='+', metavar='NAME', choices=list(STRATEGIES),
+                        help='strategies to play (default: all of them)')
+    parser.add_argument('--limit', type=int, default=16, help='stay at this total or higher (default 16)')
+    parser.add_argument('--decks', type=int, default=6, help='decks in a shoe (default 6)')
+    parser.add_argument('--shoes', type=int, default=1000, help='shoes per strategy (default 1000)')
+    parser.add_argument('--rec-rounds', type=int, default=10,
+                        help='rounds at the end of each shoe that are recorded (default 10)')
+    parser.add_argument('--cut', type=int, default=12,
+                        help='a new round needs at least this many cards left (default 12)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=('batch', 'scalar'), default='batch',
+                        help='numpy batch engine or the one shoe at a time engine (default batch)')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes for the batch engine')
+    parser.add_argument('--block-size', type=int, default=1000, help='shoes per work unit')
+    parser.add_argument('--curve-points', type=int, default=1000,
+                        help='points kept on every results curve, 0 keeps every shoe (default 1000)')
+    parser.add_argument('--progress', action='store_true', help='print intervals after every block')
+    parser.add_argument('--plot', nargs='?', const='', metavar='PNG', help='plot the results (to a file)')
+    parser.add_argument('--profile', metavar='JSON', help='instrument the run and save the timings')
+    parser.add_argument('--shared-shoes', action='store_true',
+                        help='shuffle all the shoes up front into shared memory, every strategy and '
+                             'both engines play the same ones')
+    parser.add_argument('--checkpoint', metavar='FILE', help='save the sweep\'s progress to this file')
+    parser.add_argument('--checkpoint-seconds', type=float, default=60,
+                        help='seconds between checkpoints (default 60)')
+    parser.add_argument('--resume', action='store_true', help='carry on from the checkpoint if there is one')
+    parser.add_argument('--store', metavar='DIR', help='append every shoe\'s record to this result store')
+    parser.add_argument('--from-store', metavar='DIR',
+                        help='report and plot the results in a store instead of simulating')
+
+    money = parser.add_argument_group('bankroll', 'bet off the true count and simulate bankroll paths')
+    money.add_argument('--bankroll', type=float, metavar='UNITS', help='starting bankroll in betting units')
+    money.add_argument('--ramp', type=parse_ramp, default='2:2,3:4,4:6,5:8',
+                       help='true count:units bet from that count up (default 2:2,3:4,4:6,5:8)')
+    money.add_argument('--paths', type=int, default=100000, help='bankroll paths (default 100000)')
+    money.add_argument('--hours', type=float, default=100, help='hours played per path (default 100)')
+    money.add_argument('--rounds-per-hour', type=int, default=100)
+    money.add_argument('--full-rules', action='store_true',
+                       help='play the shoes with basic strategy, doubles, splits and surrender')
+    args = parser.parse_args(argv)
+    if args.store and args.engine == 'scalar':
+        parser.error('--store needs the batch engine')
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    # the curves stay the same size however many shoes are played
+    args.curve_points = args.curve_points or None
+    return args
+
+# '2:2,3:4' -> {2: 2.0, 3: 4.0}
+def parse_ramp(text):
+    ramp = {}
+    for step in filter(None, text.split(',')):
+        count, units = step.split(':')
+        ramp[float(count)] = float(units)
+    return ramp
+
+
+# The sweep with play_blackjack, one shoe at a time. It uses the global
+# random generator, so its state goes into the checkpoint with the tallies.
+# With a shoe_pool every strategy plays the pool's shoes in order
+def scalar_sweep(strategies, games_sim, limit, rec_rounds, number_decks, cut, seed,
+                 checkpoint=None, resume=False, checkpoint_seconds=60, shoe_pool=None):
+    import os
+    import random
+    import time
+    from .game import play_blackjack
+    from .stats import RunningStats
+
+    run = dict(strategies=list(strategies), games_sim=games_sim, limit=limit, rec_rounds=rec_rounds,
+               number_decks=number_decks, cut=cut, seed=seed)
+    random.seed(seed)
+    results, stats = {s: [] for s in strategies}, {s: RunningStats() for s in strategies}
+    position, wins = [0, 0], 0  # strategy and shoe to play next
+    if checkpoint is not None:
+        # checkpoint files need numpy, a run without one stays standard library only
+        from .checkpoint import check_settings, dump_stats, load_checkpoint, load_stats, save_checkpoint
+    if resume and checkpoint is not None and os.path.exists(checkpoint):
+        state, results = load_checkpoint(checkpoint)
+        check_settings(state, run)
+        position, wins, stats = state['position'], state['wins'], load_stats(state['stats'])
+        version, internal, gauss = state['random']
+        random.setstate((version, tuple(internal), gauss))
+
+    def save(position):
+        save_checkpoint(checkpoint, {'settings': run, 'position': position, 'wins': wins,
+                                     'stats': dump_stats(stats), 'random': random.getstate()}, results)
+
+    saved = time.monotonic()
+    for i in range(position[0], len(strategies)):
+        strat = strategies[i]
+        first, position = position[1], [i, 0]
+        if first == 0:
+            wins = 0
+        for shoe in range(first + 1, games_sim + 1):
+            deck = None if shoe_pool is None else shoe_pool.deck(shoe - 1)
+            black_jack = play_blackjack(limit, strat, deck, rec_rounds, number_decks, cut)
+            last = sum(black_jack[0]) + sum(black_jack[1])
+            wins += last
+            stats[strat].add(last/rec_rounds)
+            results[strat].append(round(wins/(rec_rounds*shoe)*100, 4))
+            if checkpoint is not None and time.monotonic() - saved >= checkpoint_seconds:
+                save([i, shoe])
+                saved = time.monotonic()
+    if checkpoint is not None:
+        save([len(strategies), 0])
+    return results, stats
+
+
+# Results and plot from a result store, nothing is simulated
+def report_store(args):
+    from .store import curves, strategy_stats
+    results, shoes = curves(args.from_store, args.curve_points)
+    stats = strategy_stats(args.from_store)
+    for strat in results:
+        if args.strategies and strat not in args.strategies:
+            continue
+        low, high = stats[strat].interval()
+        print(f"{strat:<22}{results[strat][-1]:>9.4f}%   95% interval of a shoe's last "
+              f"rounds: [{low*100:.2f}, {high*100:.2f}]   {stats[strat].count} shoes")
+    if args.plot is not None:
+        from .report import plot_results
+        plot_results({s: r for s, r in results.items() if not args.strategies or s in args.strategies},
+                     shoes, args.plot or None)
+    return 0
+
+# Risk of ruin, hourly win and drawdowns for every strategy with the ramp
+def bankroll_report(strategies, args):
+    from .bankroll import play_pool, print_simulation, rules_pool, simulate
+    for i, strat in enumerate(strategies):
+        if args.full_rules:
+            pool = rules_pool(args.shoes, strat, number_decks=args.decks, cut=args.cut, seed=args.seed)
+        else:
+            pool = play_pool(args.shoes, args.limit, strat, args.decks, args.cut, rng=args.seed)
+        summary = simulate(pool, args.ramp, args.bankroll, args.hours, args.rounds_per_hour, args.paths,
+                           rng=[args.seed, i])
+        print_simulation(strat, summary)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from . import instrument
+    from .counting import STRATEGIES
+
+    strategies = args.strategies or list(STRATEGIES)
+    if args.from_store:
+        return report_store(args)
+    if args.engine == 'batch':
+        from .stats import curve_shoes
+        from .sweep import print_report, sweep
+    else:
+        # not used here, it is imported so --profile's instrument.enable
+        # finds the scalar engine and times it
+        from . import game  # noqa: F401
+    if args.profile:
+        # only modules that are already imported get timed, and worker
+        # processes keep their own timings so profile in this one
+        args.workers = 1
+        instrument.enable()
+
+    shoe_pool = None
+    if args.shared_shoes:
+        from .shoes import ShoePool
+        shoe_pool = ShoePool.for_sweep(args.shoes, args.decks, args.seed, args.block_size)
+    try:
+        if args.engine == 'scalar':
+            results, stats = scalar_sweep(strategies, args.shoes, args.limit, args.rec_rounds,
+                                          args.decks, args.cut, args.seed, args.checkpoint, args.resume,
+                                          args.checkpoint_seconds, shoe_pool)
+            shoes = None
+        else:
+            final = {}
+            def report(stats, done):
+                final.update(stats)
+                if args.progress:
+                    print_report(stats, done)
+            results = sweep(strategies, args.shoes, args.limit, args.rec_rounds, args.decks, args.cut,
+                            args.seed, args.workers, args.block_size, curve_points=args.curve_points,
+                            report=report, store=args.store, checkpoint=args.checkpoint, resume=args.resume,
+                            checkpoint_seconds=args.checkpoint_seconds, shoe_pool=shoe_pool)
+            stats = final
+            shoes = None if args.curve_points is None else curve_shoes(args.shoes, args.curve_points)
+    finally:
+        if shoe_pool is not None:
+            shoe_pool.close()
+
+    if args.profile:
+        instrument.disable()
+        instrument.write_json(args.profile)
+
+    for strat in strategies:
+        low, high = stats[strat].interval()
+        print(f"{strat:<22}{results[strat][-1]:>9.4f}%   95% interval of a shoe's last "
+              f"{args.rec_rounds} rounds: [{low*100:.2f}, {high*100:.2f}]")
+
+    if args.bankroll is not None:
+        bankroll_report(strategies, args)
+
+    if args.plot is not None:
+        from .report import plot_results
+        plot_results(results, shoes, args.plot or None)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# Comparing strategies with fewer shoes. A 1000 shoe sweep can't tell apart
+# strategies a few tenths of a percent away from each other, but most of a
+# shoe's noise is the shoe itself: every strategy plays the same cards, so
+# they win and lose together. Played on the same shoes (the sweep's blocks
+# and seeds) the difference to a baseline strategy has a much smaller
+# variance than two independent runs, and with the long run rate of a
+# control strategy known (the 'No Strategy' row of a big sweep or grid) the
+# same correlation sharpens every strategy's own rate as a control variate.
+#
+# Antithetic shoes play every shoe a second time with its ranks mirrored
+# (2 <-> A, 3 <-> K, ... 6 <-> 10, 7, 8 and 9 stay) and average the two. The
+# mirrored shoe has the same distribution but the last rounds of a shoe hang
+# on the exact cards, the two halves barely correlate, so it is off unless
+# asked for.
+#
+# The sequential mode looks after every block and stops a strategy as soon
+# as its interval against the baseline doesn't cover 0 (or is narrower than
+# precision). The intervals use a Bonferroni z for every look it could
+# make, so stopping early doesn't make them lie.
+#
+#   python -m blackjack.compare --baseline 'No Strategy' --shoes 200000 --sequential
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from .batch import last_rounds, play_strategies
+from .counting import STRATEGIES
+from .shoes import block_rng, create_shoes
+from .stats import RunningPairs, RunningStats
+
+# Strategy whose long run rate is used as the control variate
+CONTROL = 'No Strategy'
+# Rank code -> its mirror for antithetic shoes
+MIRROR = np.array([12, 11, 10, 9, 8, 5, 6, 7, 4, 3, 2, 1, 0], dtype=np.int8)
+
+
+# Per-shoe win and draw rate in the last rec_rounds of every shoe of one
+# block, {strategy: array}. With antithetic every shoe is also played
+# mirrored and the two rates are averaged
+def run_block(strategies, block, games_sim, limit=16, rec_rounds=10, number_decks=6, cut=12,
+              seed=0, block_size=1000, antithetic=False):
+    shoes = create_shoes(min(block_size, games_sim - block*block_size), number_decks, block_rng(seed, block))
+    played = play_strategies(shoes, limit, strategies, cut)
+    rates = {s: last_rounds(played[s], rec_rounds)/rec_rounds for s in strategies}
+    if antithetic:
+        played = play_strategies(MIRROR[shoes], limit, strategies, cut)
+        rates = {s: (rates[s] + last_rounds(played[s], rec_rounds)/rec_rounds)/2 for s in strategies}
+    return rates
+
+
+# Play strategies against baseline on the same shoes, at most games_sim of
+# them. Returns {strategy: summary}, see _summary. With sequential a strategy
+# stops once its difference to the baseline is resolved at level alpha, or
+# (with precision) once that interval's half width is below precision, but
+# not before min_shoes. control_mean is the long run rate of CONTROL, a
+# fraction, and turns on the control variate estimates. Blocks are folded
+# in order and a stopped strategy ignores blocks that were already running,
+# so the results only depend on the seed
+def compare(strategies=None, baseline=CONTROL, games_sim=100000, limit=16, rec_rounds=10, number_decks=6,
+            cut=12, seed=0, block_size=1000, antithetic=False, control_mean=None, sequential=False,
+            alpha=0.05, precision=None, min_shoes=None, workers=1, progress=None):
+    strategies = [s for s in (STRATEGIES if strategies is None else strategies) if s != baseline]
+    blocks = (games_sim + block_size - 1)//block_size
+    min_shoes = 2*block_size if min_shoes is None else min_shoes
+    looks = max(1, blocks - (min_shoes - 1)//block_size) if sequential else 1
+    z = NormalDist().inv_cdf(1 - alpha/(2*looks))
+
+    diffs = {s: RunningStats() for s in strategies}
+    controls = {s: RunningPairs() for s in strategies + [baseline]}
+    active, stopped = set(strategies), {}
+    lanes = [baseline] + ([CONTROL] if control_mean is not None and CONTROL != baseline else [])
+
+    def play(block):
+        return list(dict.fromkeys(lanes + sorted(active))), block
+
+    def fold(block, rates):
+        x_base = rates[baseline]
+        control = rates[CONTROL] if control_mean is not None else x_base
+        for s in [baseline] + strategies:
+            if s == baseline or s in active:
+                controls[s].add_many(rates[s], control)
+        for s in sorted(active):
+            diffs[s].add_many(rates[s] - x_base)
+            st = diffs[s]
+            half = z*st.std/np.sqrt(st.count)
+            if sequential and st.count >= min_shoes and abs(st.mean) > half:
+                stopped[s] = 'resolved'
+            elif sequential and st.count >= min_shoes and precision is not None and half <= precision:
+                stopped[s] = 'precision'
+            elif block == blocks - 1:
+                stopped[s] = 'all shoes'
+        active.difference_update(stopped)
+        if progress is not None:
+            progress(block, diffs, stopped)
+
+    settings = (games_sim, limit, rec_rounds, number_decks, cut, seed, block_size, antithetic)
+    block = 0
+    if workers == 1:
+        while active and block < blocks:
+            fold(block, run_block(*play(block), *settings))
+            block += 1
+    else:
+        ahead = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = deque()
+            while active and (running or block < blocks):
+                # keep a couple of blocks per worker going, the newest ones
+                # only play what is still active
+                while block < blocks and len(running) < 2*ahead and active:
+                    running.append((block, pool.submit(run_block, *play(block), *settings)))
+                    block += 1
+                done, future = running.popleft()
+                fold(done, future.result())
+            for _, future in running:
+                future.cancel()
+
+    base_variance = controls[baseline].x.variance
+    return {s: _summary(s, diffs.get(s), controls[s], base_variance, control_mean, stopped.get(s), z)
+            for s in [baseline] + strategies}
+
+# What compare() returns for a strategy: shoes played, its rate with a 95%
+# interval, the difference to the baseline with the z the stops used, how
+# many times fewer shoes the pairing needs than two independent runs and,
+# with a control_mean, the control variate rate and its gain
+def _summary(strategy, diff, pairs, base_variance, control_mean, stopped, z):
+    st = pairs.x
+    low, high = st.interval()
+    out = {'strategy': strategy, 'shoes': st.count, 'mean': st.mean, 'low': low, 'high': high,
+           'stopped': stopped}
+    if diff is not None:
+        half = z*diff.std/np.sqrt(diff.count)
+        # a strategy that plays exactly like the baseline has no difference at all
+        out.update({'difference': diff.mean, 'diff low': diff.mean - half, 'diff high': diff.mean + half,
+                    'paired gain': _gain(st.variance + base_variance, diff.variance)})
+    if control_mean is not None and strategy != CONTROL and st.count > 2:
+        beta = pairs.covariance/pairs.y.variance if pairs.y.variance > 0 else 0.0
+        variance = max(st.variance - pairs.covariance*beta, 0.0)
+        mean = st.mean - beta*(pairs.y.mean - control_mean)
+        half = 1.96*np.sqrt(variance/st.count)
+        out.update({'cv mean': mean, 'cv low': mean - half, 'cv high': mean + half,
+                    'cv gain': _gain(st.variance, variance)})
+    return out
+
+# Variance before over variance after, inf when nothing is left
+def _gain(before, after):
+    return before/after if after > 0 else float('inf')
+
+def _times(gain):
+    return 'identical' if gain == float('inf') else f"{gain:.2f}x"
+
+
+def print_comparison(results, baseline):
+    print(f"{'strategy':<22}{'shoes':>8}{'win+draw %':>12}  {'vs ' + baseline + ' %':<30}{'paired':>10}"
+          f"{'cv %':>10}{'cv gain':>9}  stopped")
+    for r in results.values():
+        diff = (f"{r['difference']*100:+.3f} [{r['diff low']*100:+.3f}, {r['diff high']*100:+.3f}]"
+                if 'difference' in r else '')
+        paired = _times(r['paired gain']) if 'paired gain' in r else ''
+        cv = f"{r['cv mean']*100:10.4f}{_times(r['cv gain']):>9}" if 'cv mean' in r else ''
+        print(f"{r['strategy']:<22}{r['shoes']:>8}{r['mean']*100:>12.4f}  {diff:<30}{paired:>10}{cv:>19}  "
+              f"{r['stopped'] or ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m blackjack.compare',
+                                     description='Compare strategies against a baseline on the same shoes.')
+    parser.add_argument('--strategies', nargs='+', metavar='NAME', choices=list(STRATEGIES))
+    parser.add_argument('--baseline', default=CONTROL, choices=list(STRATEGIES),
+                        help=f"strategy the others are compared with (default {CONTROL})")
+    parser.add_argument('--limit', type=int, default=16)
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--cut', type=int, default=12)
+    parser.add_argument('--rec-rounds', type=int, default=10)
+    parser.add_argument('--shoes', type=int, default=100000, help='most shoes per strategy (default 100000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--block-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--antithetic', action='store_true', help='also play every shoe with mirrored ranks')
+    parser.add_argument('--control-mean', type=float, metavar='PCT',
+                        help=f"long run win and draw percentage of {CONTROL}, turns on control variates")
+    parser.add_argument('--sequential', action='store_true',
+                        help='stop a strategy once its difference to the baseline is resolved')
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--precision', type=float, metavar='PCT',
+                        help='with --sequential, also stop once the difference is known to within this')
+    parser.add_argument('--min-shoes', type=int)
+    parser.add_argument('--progress', action='store_true', help='print the shoes played after every block')
+    args = parser.parse_args(argv)
+
+    def progress(block, diffs, stopped):
+        print(f"block {block + 1}: {len(stopped)}/{len(diffs)} stopped", file=sys.stderr)
+
+    results = compare(args.strategies, args.baseline, args.shoes, args.limit, args.rec_rounds, args.decks,
+                      args.cut, args.seed, args.block_size, args.antithetic,
+                      None if args.control_mean is None else args.control_mean/100, args.sequential,
+                      args.alpha, None if args.precision is None else args.precision/100, args.min_shoes,
+                      args.workers, progress if args.progress else None)
+    print_comparison(results, args.baseline)
+    played = sum(r['shoes'] for r in results.values())
+    print(f"{played} strategy shoes played of {args.shoes*len(results)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# Card counting values for every strategy.
+# The table is the one from the write-up (also saved in the pickle
+# Card_Counting_Strat_Values, which is only for writing and showing it with
+# pandas). The engines use it compiled into rows indexed by rank code, so
+# counting a card is a single index and nothing heavy has to be imported.
+
+import os
+from functools import lru_cache
+
+from .cards import RANKS
+
+# Pickle with the card counting values, stored at the top of the repo
+STRATEGY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'Card_Counting_Strat_Values')
+
+# Values for 2, 3, 4, 5, 6, 7, 8, 9, 10, J, Q, K, A
+STRATEGIES = {
+    'Hi-Lo (Most Common)': (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1),
+    'Hi-Opt I':            (0, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, 0),
+    'Hi-Opt II':           (1, 1, 2, 2, 1, 1, 0, 0, -2, -2, -2, -2, 0),
+    'KO':                  (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1),
+    'Omega II':            (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0),
+    'Red 7':               (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1),
+    'Halves':              (.5, 1, 1, 1.5, 1, .5, 0, -.5, -1, -1, -1, -1, -1),
+    'Zen Count':           (1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2, -1),
+    'Double It':           (2, 2, 2, 2, 2, 0, 0, 0, -2, -2, -2, -2, -2),
+    'No Strategy':         (0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+}
+
+
+# One row of floats per strategy, indexed by rank code
+def count_rows():
+    return {name: [float(v) for v in row] for name, row in STRATEGIES.items()}
+
+# Turn a DataFrame like the one in the pickle into the strategy names and a
+# strategy x rank matrix. The 'A.' column is left out, a card is always
+# counted before an Ace in the hand can be turned into a one so it is 'A'
+def compile_counts(df):
+    import numpy as np
+    names = tuple(df.index)
+    table = df[list(RANKS)].to_numpy(dtype=np.float64)
+    return names, table
+
+# Read a pickled table (needs pandas) and compile it
+def load_counts(path=STRATEGY_FILE):
+    import pandas as pd
+    return compile_counts(pd.read_pickle(path))
+
+# The strategy names and strategy x rank matrix the batch engines use
+@lru_cache(maxsize=None)
+def count_table():
+    import numpy as np
+    return tuple(STRATEGIES), np.array(list(STRATEGIES.values()), dtype=np.float64)
+
+# Card counting values for one strategy, indexed by rank
+def strategy_weights(strategy):
+    names, table = count_table()
+    return table[names.index(strategy)]
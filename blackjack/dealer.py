@@ -0,0 +1,156 @@
+# Exact probabilities for how the dealer's hand finishes, worked out from the
+# cards left in the shoe instead of by dealing them. The dealer hits until
+# they are over 16 and an Ace is a one only when it would bust them, the same
+# rules as dealer_turn. Results are cached so positions that come up again
+# during a shoe are nearly free.
+
+from functools import lru_cache
+
+import numpy as np
+
+# The shoe is described by how many cards of each value are left,
+# 10, J, Q and K all play the same for the dealer so they share a class
+CLASS_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+CLASS_OF_RANK = (0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9)  # rank code -> class
+
+# The dealer's final hand, index into every distribution
+FINALS = (17, 18, 19, 20, 21, 'bust')
+BUST = 5
+
+
+# Cards left in the shoe as a tuple of counts per value class,
+# cards is any list or array of rank codes
+def composition(cards):
+    counts = [0]*len(CLASS_VALUES)
+    for card in cards:
+        counts[CLASS_OF_RANK[card]] += 1
+    return tuple(counts)
+
+# Take one card of a class out of the composition
+def remove(counts, cls):
+    return counts[:cls] + (counts[cls] - 1,) + counts[cls + 1:]
+
+
+# Every way the dealer can draw from a total and number of Aces still
+# counted as eleven until they are done. Draws that only differ in order are
+# grouped: cards is one row per group with how many of each class were drawn,
+# orders how many orderings of it the dealer could actually draw and final
+# which hand it ends on. Doesn't depend on the shoe so it is only done once
+@lru_cache(maxsize=None)
+def _draws(total, aces):
+    groups = {}
+    def draw(total, aces, cards):
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        if total > 16:
+            key = (tuple(cards), min(total - 17, BUST))
+            groups[key] = groups.get(key, 0) + 1
+            return
+        for cls, value in enumerate(CLASS_VALUES):
+            cards[cls] += 1
+            draw(total + value, aces + (cls == 9), cards)
+            cards[cls] -= 1
+    draw(total, aces, [0]*len(CLASS_VALUES))
+
+    cards = np.array([key[0] for key in groups], dtype=np.int64)
+    orders = np.array(list(groups.values()), dtype=np.float64)
+    final = np.array([key[1] for key in groups], dtype=np.int64)
+    return cards, orders, final, cards.sum(axis=1)
+
+# Probability of each final hand from a dealer total, the number of Aces
+# still counted as eleven and the cards left. A particular ordering of the
+# drawn cards has the same chance as any other ordering of them, so every
+# group only needs one product of counts. If the shoe runs out before the
+# dealer is done the round has no result and the chances add up to less than one
+@lru_cache(maxsize=1 << 16)
+def _finish(total, aces, counts):
+    cards, orders, final, size = _draws(total, aces)
+    counts = np.array(counts, dtype=np.float64)
+    left = counts.sum()
+    deep = int(size.max()) + 1
+
+    # ways[cls, k] = counts*(counts - 1)*...*(counts - k + 1), zero once they run out
+    steps = np.arange(deep - 1)
+    ways = np.ones((len(counts), deep))
+    ways[:, 1:] = np.cumprod(np.clip(counts[:, None] - steps, 0, None), axis=1)
+    drawn = np.ones(deep)
+    drawn[1:] = np.cumprod(np.clip(left - steps, 0, None))
+
+    possible = size <= left
+    chance = orders[possible]*ways[np.arange(len(counts)), cards[possible]].prod(axis=1)/drawn[size[possible]]
+    return tuple(np.bincount(final[possible], weights=chance, minlength=len(FINALS)).tolist())
+
+# Distribution of the dealer's final hand given the value of the card they
+# show (2-11) and the composition of the rest of the shoe, hidden card included
+@lru_cache(maxsize=4096)
+def dealer_distribution(up_card, counts):
+    return _finish(up_card, int(up_card == 11), tuple(counts))
+
+# How full the caches are
+def cache_info():
+    return {'positions': dealer_distribution.cache_info(), 'states': _finish.cache_info()}
+
+def clear_cache():
+    dealer_distribution.cache_clear()
+    _finish.cache_clear()
+
+
+# Expected result of standing on total (+1 win, -1 loss, 0 draw).
+# Same rules as dealer_turn: a dealer 21 always beats the player
+def stand_ev(total, up_card, counts):
+    if total > 21:
+        return -1.0
+    probs = dealer_distribution(up_card, tuple(counts))
+    ev = probs[BUST]
+    for final, p in zip(FINALS[:BUST], probs):
+        if final == 21 or final > total:
+            ev -= p
+        elif final < total:
+            ev += p
+    return ev
+
+# Expected result of hitting once and then playing the best of hit or stay
+# on every card after that, with the cards the player takes out of the shoe.
+# Like blackjack(), hitting to exactly 21 wins straight away
+def hit_ev(total, aces, up_card, counts):
+    counts = tuple(counts)
+    left = sum(counts)
+    if not left:
+        return stand_ev(total, up_card, counts)
+    ev = 0.0
+    for cls, count in enumerate(counts):
+        if count:
+            rest = remove(counts, cls)
+            new_total, new_aces = total + CLASS_VALUES[cls], aces + (cls == 9)
+            while new_total > 21 and new_aces:
+                new_total -= 10
+                new_aces -= 1
+            # a soft bust that drops to 21 wins too
+            if new_total == 21:
+                ev += count/left
+            elif new_total > 21:
+                ev -= count/left
+            else:
+                ev += count/left*best_ev(new_total, new_aces, up_card, rest)
+    return ev
+
+# Best of standing and hitting
+@lru_cache(maxsize=1 << 16)
+def best_ev(total, aces, up_card, counts):
+    stand = stand_ev(total, up_card, counts)
+    if total >= 21:
+        return stand
+    return max(stand, hit_ev(total, aces, up_card, counts))
+
+# 'hit' or 'stay' for a player hand, whichever has the higher expected result
+def decision(your_hand, up_card, counts):
+    # Aces turned into ones first, like dealer_turn does (two Aces are 22)
+    total, aces = your_hand.total, your_hand.aces
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    if total >= 21:
+        return 'stay'
+    hit = hit_ev(total, aces, up_card, counts)
+    return 'hit' if hit > stand_ev(total, up_card, counts) else 'stay'
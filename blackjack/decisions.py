@@ -0,0 +1,144 @@
+# Basic strategy from BasicStrategy.csv compiled into decision tables.
+# The chart is read once and turned into one flat list of action codes for
+# every true count bucket, what the hand may still do, hand class, total and
+# the dealer's card, so a decision during a round is a single index.
+# Count based deviations (see HI_LO_DEVIATIONS) are compiled in per bucket.
+
+import csv
+import os
+from functools import lru_cache
+
+from .cards import CARD_VALUES, RANK_CODE, RANKS
+
+# The chart, shipped inside the package so installs have it too
+BASIC_STRATEGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'BasicStrategy.csv')
+
+# Actions, keyed by the codes the chart uses
+HIT, STAND, DOUBLE, SPLIT, SURRENDER = range(5)
+ACTIONS = {'H': HIT, 'S': STAND, 'D': DOUBLE, 'P': SPLIT, 'Sr': SURRENDER}
+
+# Hand classes. A pair is stored under the value of one of its cards
+# (AA is 11), hard and soft hands under their total
+HARD, SOFT, PAIR = range(3)
+TOTALS = 22
+
+# What the hand is still allowed to do, or-ed together. Hands that can't
+# double hit instead (stand on soft 18 or more), ones that can't surrender hit
+CAN_DOUBLE, CAN_SURRENDER = 1, 2
+OPTIONS = 4
+
+# True counts -5 to +5 each get their own copy of the table,
+# counts past the ends use the one at that end
+TC_RANGE = 5
+BUCKETS = 2*TC_RANGE + 1
+
+# Hi-Lo index plays that use the actions in the chart:
+# (hand, dealer's card, true count, action at or above it, action below it)
+HI_LO_DEVIATIONS = (
+    ('12', '2', 3, 'S', 'H'),
+    ('12', '3', 2, 'S', 'H'),
+    ('12', '4', 0, 'S', 'H'),
+    ('12', '5', -2, 'S', 'H'),
+    ('12', '6', -1, 'S', 'H'),
+    ('13', '2', -1, 'S', 'H'),
+    ('13', '3', -2, 'S', 'H'),
+    ('11', 'A', 1, 'D', 'H'),
+    ('10', '10', 4, 'D', 'H'),
+    ('10', 'A', 4, 'D', 'H'),
+    ('9', '2', 1, 'D', 'H'),
+    ('9', '7', 3, 'D', 'H'),
+    ('1010', '5', 5, 'P', 'S'),
+    ('1010', '6', 4, 'P', 'S'),
+)
+
+
+# Hand class and table total for a row label of the chart:
+# '16' is hard 16, 'A7' soft 18 and '99' a pair of nines
+def parse_hand(label):
+    if label == 'AA':
+        return PAIR, 11
+    if label.startswith('A'):
+        return SOFT, 11 + int(label[1:])
+    if label == '1010' or (len(label) == 2 and label[0] == label[1] != '1'):
+        return PAIR, int(label[:len(label)//2])
+    return HARD, int(label)
+
+# The chart as {(hand class, total): action per rank code of the dealer's card}
+def read_chart(path=BASIC_STRATEGY_FILE):
+    chart = {}
+    with open(path, newline='') as f:
+        # the file has old Mac line endings
+        lines = f.read().splitlines()
+    reader = csv.reader(lines, delimiter=';')
+    next(reader)  # Player;Two;...;Ace, same order as the rank codes
+    for row in reader:
+        if row:
+            chart[parse_hand(row[0])] = [ACTIONS[code] for code in row[1:]]
+    return chart
+
+
+# Index of a decision in a compiled table
+def table_index(bucket, options, hand_class, total, up_card):
+    return (((bucket*OPTIONS + options)*3 + hand_class)*TOTALS + total)*len(RANKS) + up_card
+
+# Bucket of a true count
+def tc_bucket(true_count):
+    return int(min(max(true_count, -TC_RANGE), TC_RANGE)) + TC_RANGE
+
+
+# Action for a row of the chart, with what the hand can do taken into account
+def _allowed(action, options, hand_class, total):
+    if action == DOUBLE and not options & CAN_DOUBLE:
+        return STAND if hand_class == SOFT and total >= 18 else HIT
+    if action == SURRENDER and not options & CAN_SURRENDER:
+        return HIT
+    return action
+
+# Rows the chart leaves out: hard totals under 5 play like 5, soft 12 (two
+# Aces that can't be split) hits and a missing pair plays as its total
+def _fill(chart):
+    rows = dict(chart)
+    for total in range(TOTALS):
+        rows.setdefault((HARD, total), rows[HARD, 5] if total < 5 else [HIT]*len(RANKS))
+        rows.setdefault((SOFT, total), [HIT]*len(RANKS))
+    for value in range(2, 12):
+        if (PAIR, value) not in rows:
+            rows[PAIR, value] = rows[SOFT, 12] if value == 11 else rows[HARD, 2*value]
+    return rows
+
+# Compile a chart and deviations into the flat table
+def compile_table(chart, deviations=()):
+    rows = _fill(chart)
+    bucket_rows = []
+    for bucket in range(BUCKETS):
+        rows_at = {key: list(row) for key, row in rows.items()}
+        for hand, up, index, above, below in deviations:
+            if not -TC_RANGE < index <= TC_RANGE:
+                raise ValueError(f"deviation index {index} for {hand} v {up} is outside ({-TC_RANGE}, {TC_RANGE}]")
+            action = ACTIONS[above if bucket - TC_RANGE >= index else below]
+            up_value = CARD_VALUES[RANK_CODE[up]]
+            for rank, value in enumerate(CARD_VALUES):
+                if value == up_value:
+                    rows_at[parse_hand(hand)][rank] = action
+        bucket_rows.append(rows_at)
+
+    table = []
+    for rows_at in bucket_rows:
+        for options in range(OPTIONS):
+            for cls in (HARD, SOFT, PAIR):
+                for total in range(TOTALS):
+                    row = rows_at.get((cls, total), [HIT]*len(RANKS))
+                    table.extend(_allowed(action, options, cls, total) for action in row)
+    return table
+
+# The compiled table for BasicStrategy.csv, deviations is a tuple like
+# HI_LO_DEVIATIONS (or empty for plain basic strategy)
+@lru_cache(maxsize=None)
+def basic_table(deviations=()):
+    return compile_table(read_chart(), deviations)
+
+# The same table as a numpy array, indexed
+# [bucket, options, hand class, total, dealer's rank]
+def decision_array(deviations=()):
+    import numpy as np
+    return np.array(basic_table(deviations), dtype=np.int8).reshape(BUCKETS, OPTIONS, 3, TOTALS, len(RANKS))
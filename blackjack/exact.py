@@ -0,0 +1,150 @@
+# Exact win, loss and draw chances for a round of blackjack() with a given
+# limit and counting strategy, no shoes are simulated. Every way the cards
+# can come out is walked through with the player's hit/stay logic and the
+# dealer's rules, positions that share the same cards left are only worked
+# out once. Off the top of a fresh shoe this gives the exact answer the
+# simulator is estimating.
+
+from functools import lru_cache
+
+from .cards import RANKS
+from .counting import count_table
+from .dealer import CLASS_OF_RANK, CLASS_VALUES, FINALS, _finish, remove
+
+# Chance of each result of the round, same order as blackjack() returns them,
+# the last one is a round that ran out of cards and has no result
+WIN, LOSS, DRAW, NO_RESULT = 0, 1, 2, 3
+
+
+# Counting values per value class, 10, J, Q and K have to count the same
+def class_weights(strategy):
+    names, table = count_table()
+    row = table[names.index(strategy)]
+    weights = [None]*len(CLASS_VALUES)
+    for rank, cls in enumerate(CLASS_OF_RANK):
+        if weights[cls] is not None and weights[cls] != row[rank]:
+            raise ValueError(f"{strategy} counts {RANKS[rank]} differently from the other ten-valued cards")
+        weights[cls] = float(row[rank])
+    return tuple(weights)
+
+# Sign of true_counter's result, that is all player_turn looks at
+def count_sign(running_count, left):
+    decks = left//52
+    true_count = round(running_count/decks) if decks else running_count
+    return (true_count > 0) - (true_count < 0)
+
+# player_turn for a total, limit, sign of the true count and dealer's card
+def hits(total, limit, sign, up_card):
+    if sign > 0:
+        return total < limit
+    if sign < 0:
+        return total <= limit
+    return total < 12 or (total < 17 and up_card > 6)
+
+# Add the chances in sub, weighted by chance, into probs
+def _add(probs, chance, sub):
+    for i, p in enumerate(sub):
+        probs[i] += chance*p
+
+
+# The dealer plays and the hands are compared, like dealer_turn
+def _dealer(total, dealer_total, dealer_aces, counts):
+    finals = _finish(dealer_total, dealer_aces, counts)
+    probs = [0.0]*4
+    for final, p in zip(FINALS, finals):
+        if final == 'bust':
+            probs[WIN] += p
+        elif final == 21 or final > total:
+            probs[LOSS] += p
+        elif final < total:
+            probs[WIN] += p
+        else:
+            probs[DRAW] += p
+    probs[NO_RESULT] = max(0.0, 1.0 - sum(finals))  # the shoe ran out on the dealer
+    return probs
+
+
+# The player's loop in blackjack(): total and live Aces of the player, the
+# running count, the cards left in the shoe, the dealer's shown card and the
+# dealer's two card total and live Aces. The dealer's hidden card only gets
+# counted once the player is done, so it never changes a decision
+@lru_cache(maxsize=1 << 18)
+def _player(total, aces, running, counts, up_card, dealer_total, dealer_aces, limit, weights):
+    left = sum(counts)
+    if left <= 1:
+        return (0.0, 0.0, 0.0, 1.0)
+
+    # Blackjacks
+    if total == 21 and dealer_total < 21:
+        return (1.0, 0.0, 0.0, 0.0)
+    if total == 21 and dealer_total == 21:
+        return (0.0, 0.0, 1.0, 0.0)
+
+    if not hits(total, limit, count_sign(running, left), up_card):
+        # dealer_turn fixes a busted hand with an Ace first
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        return tuple(_dealer(total, dealer_total, dealer_aces, counts))
+
+    probs = [0.0]*4
+    for cls, count in enumerate(counts):
+        if not count:
+            continue
+        chance = count/left
+        new_total, new_aces = total + CLASS_VALUES[cls], aces + (cls == 9)
+        if new_total > 21:
+            if new_aces:
+                sub = _player(new_total - 10, new_aces - 1, running + weights[cls], remove(counts, cls),
+                              up_card, dealer_total, dealer_aces, limit, weights)
+                _add(probs, chance, sub)
+            else:
+                probs[LOSS] += chance
+        elif new_total == 21:
+            probs[WIN] += chance
+        else:
+            sub = _player(new_total, new_aces, running + weights[cls], remove(counts, cls),
+                          up_card, dealer_total, dealer_aces, limit, weights)
+            _add(probs, chance, sub)
+    return tuple(probs)
+
+
+# Exact chances of (win, loss, draw, no result) for the next round of
+# blackjack() with this limit and strategy. By default that is the first
+# round of a fresh shoe of number_decks, counts (cards left per value class,
+# see dealer.composition) and running_count start it anywhere in a shoe
+def analyze(limit=16, strategy='Hi-Lo (Most Common)', number_decks=6, counts=None, running_count=0):
+    weights = class_weights(strategy)
+    if counts is None:
+        counts = tuple(4*number_decks*CLASS_OF_RANK.count(cls) for cls in range(len(CLASS_VALUES)))
+    counts = tuple(counts)
+
+    probs = [0.0]*4
+    # The four cards dealt at the start: two to the player then two to the dealer
+    for first, second, up, hole, chance, rest in _deals(counts):
+        total = CLASS_VALUES[first] + CLASS_VALUES[second]
+        aces = (first == 9) + (second == 9)
+        dealer_total = CLASS_VALUES[up] + CLASS_VALUES[hole]
+        dealer_aces = (up == 9) + (hole == 9)
+        running = running_count + weights[first] + weights[second] + weights[up]
+        sub = _player(total, aces, running, rest, CLASS_VALUES[up], dealer_total, dealer_aces, limit, weights)
+        _add(probs, chance, sub)
+    return dict(zip(('win', 'loss', 'draw', 'no result'), probs))
+
+# Every way the first four cards can come out with its chance
+def _deals(counts):
+    left = sum(counts)
+    for first in _classes(counts):
+        c1 = remove(counts, first)
+        p1 = counts[first]/left
+        for second in _classes(c1):
+            c2 = remove(c1, second)
+            p2 = p1*c1[second]/(left - 1)
+            for up in _classes(c2):
+                c3 = remove(c2, up)
+                p3 = p2*c2[up]/(left - 2)
+                for hole in _classes(c3):
+                    yield first, second, up, hole, p3*c3[hole]/(left - 3), remove(c3, hole)
+
+def _classes(counts):
+    return [cls for cls, count in enumerate(counts) if count]
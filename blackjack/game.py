@@ -0,0 +1,253 @@
+# The scalar Blackjack engine from the write-up, one shoe at a time.
+# This is kept as the reference the faster engines are checked against.
+# Cards are rank codes (see cards.py) and hands are Hand objects.
+
+import random
+
+from . import instrument
+from .cards import RANKS
+from .counting import count_rows
+from .hand import Hand
+from .stats import LastRounds
+
+
+# Create a standard deck of cards, default is two decks
+@instrument.probe('shuffle', 'reshuffle')
+def create_deck(number_decks=2):
+    # a deck of cards has 4 of every card value
+    deck = list(range(len(RANKS)))*4*number_decks
+    random.shuffle(deck) #shuffle deck to randomize
+    return deck
+
+
+# Choose hit or stay
+@instrument.probe('player decision')
+def player_turn(your_hand, limit, true_count, dealer_hand):
+
+    dealer_total = dealer_hand.up_card #dealers displayed card value
+    total = your_hand.total
+
+    # true count = running count / decks remainging
+    # true count bigger than one means there are face cards left
+    if true_count > 0:
+        if total >= limit:
+            return 'stay'
+        else:
+            return 'hit'
+
+    # Meaning there are plenty of low cards left: < 6 value
+    elif true_count < 0:
+        if total <= limit:
+            return 'hit'
+        else:
+            return 'stay'
+
+    # count is neutral so use basic strategy
+    # This is a modified version of basic strat
+    else:
+        if total >= 17:
+            return 'stay'
+        elif 11 < total < 17 and dealer_total <7:
+            return 'stay'
+        elif 11 < total < 17 and dealer_total > 6:
+            return 'hit'
+        else:
+            return 'hit'
+
+
+# Dealers turn
+@instrument.probe('dealer play')
+def dealer_turn(your_hand, dealer_hand, total, dealer_total, deck, running_count, true_count, strategy, turn=True):
+    # running count of wins and losses
+    wins = 0
+    draw = 0
+    loss = 0
+    row = COUNT_ROWS[strategy]
+
+    # Check to see if there is an Ace making the player bust
+    while your_hand.total > 21 and your_hand.check_if_ace():
+        pass
+    total = your_hand.total
+
+    while turn: # Looping while its their move
+
+        # Dealing the dealer cards if <= 16, stated in the background
+        while dealer_hand.total <= 16:
+            dealer_hand.deal(deck)
+
+            # True counter and running count
+            running_count += row[dealer_hand.last]
+            true_count = true_counter(deck, running_count)
+
+        dealer_total = dealer_hand.total
+
+        # Checking to see if dealer wins
+        if dealer_total == 21:
+            loss += 1
+            break
+
+        # Dealer bust?
+        elif dealer_total > 21:
+            if dealer_hand.check_if_ace():
+                continue
+            else:
+                wins += 1
+                break
+
+        # Compare dealer hand to player hand, determine who wins
+        else:
+            if dealer_total > total:
+                loss += 1
+                break
+            elif dealer_total < total:
+                wins += 1
+                break
+            else:
+                draw += 1
+                break
+    return [wins, loss, draw, running_count, true_count]
+
+
+# One row of counting values per strategy, indexed by rank code
+COUNT_ROWS = count_rows()
+STRATEGIES = tuple(COUNT_ROWS)
+
+# Count cards using whatever strategy, default is Hi-Lo
+# It returns the sum of the cards
+def card_counter(cards, strategy='Hi-Lo (Most Common)'):
+    row = COUNT_ROWS[strategy]
+    return sum(row[card] for card in cards)
+
+# Calculates the true count, it runs after every count update
+@instrument.probe('true count', 'count update')
+def true_counter(deck, running_count):
+    decks = len(deck)//52
+    if decks:
+        return round(running_count/decks)
+    # Compensating for when there 1 deck or less than 52 cards
+    return running_count
+
+
+#play blackjack
+@instrument.probe('round', 'hand')
+def blackjack(deck, limit, running_count, true_count, strategy):
+    your_hand   = Hand().deal(deck, 2)
+    dealer_hand = Hand().deal(deck, 2)
+    row = COUNT_ROWS[strategy]
+
+    # Track wins, losses, and draws
+    wins, draw, loss = 0,0,0
+
+    # Card Counting, the dealer's second card stays hidden for now
+    running_count  += row[your_hand.first] + row[your_hand.last] + row[dealer_hand.first]
+    true_count  = true_counter(deck, running_count)
+
+    # Looping through the moves until deck is empty
+    while len(deck) > 1:
+
+        # Check if the player has blackjack
+        if your_hand.total == 21 and dealer_hand.total < 21:
+
+            # Card Counting
+            running_count  += row[dealer_hand.last]
+            true_count  = true_counter(deck, running_count)
+
+            wins += 1
+            break
+
+        # Checking if the player and the dealer both have blackjacks
+        elif your_hand.total == 21 and dealer_hand.total == 21:
+
+            # Counter
+            running_count += row[dealer_hand.last]
+            true_count = true_counter(deck, running_count)
+
+            draw += 1
+            break
+
+        # Allowing the player to move
+        move = player_turn(your_hand, limit, true_count, dealer_hand)
+
+        if move == "hit":
+            your_hand.deal(deck)
+            total = your_hand.total
+
+            # Counter
+            running_count += row[your_hand.last]
+            true_count = true_counter(deck, running_count)
+
+            # Checking if the player busts
+            if  total > 21:
+                # Ace in player hand?
+                if your_hand.check_if_ace():
+                    continue
+                # Otherwise they bust
+                else:
+                    loss += 1
+                    break
+            elif total < 21:
+                # Ask the player for a move
+                continue
+            # Check if player has gotten blackjack
+            else:
+                wins += 1
+                break
+
+        else:
+            total  = your_hand.total
+            dealer_total = dealer_hand.total
+
+            # Counter
+            running_count += row[dealer_hand.last]
+            true_count = true_counter(deck, running_count)
+
+            # The dealer's turn
+            result = dealer_turn(your_hand, dealer_hand, total, dealer_total, deck, running_count, true_count, strategy)
+
+            # The results of the dealer's turn
+            wins += result[0]
+            loss += result[1]
+            draw += result[2]
+
+            # Counter
+            running_count  = result[3]
+            true_count = result[4]
+            break
+
+    # Results of the game
+    return [wins, loss, draw, running_count, true_count]
+
+
+# Loop the game until no playing cards, a new round needs at least cut cards
+# With rec_rounds only the last rec_rounds results are kept
+# (its own time when instrumented is mostly recording the results)
+@instrument.probe('shoe')
+def play_blackjack(limit, strategy, deck=None, rec_rounds=None, number_decks=6, cut=12):
+
+    if deck is None:
+        deck = create_deck(number_decks) # create a deck with 6 decks of cards within it
+    if rec_rounds is None:
+        wins,draw,loss = [], [], []
+    else:
+        last = LastRounds(rec_rounds)
+        wins,draw,loss = last.wins, last.draw, last.loss
+    rounds_played,running_count,true_count = 0,0,0
+
+    while True:
+
+        # Running blackjack
+        game = blackjack(deck, limit, running_count, true_count, strategy)
+
+        # Record the results
+        wins.append(game[0])
+        loss.append(game[1])
+        draw.append(game[2])
+        rounds_played += 1 #add another one to idicate the end of a round
+
+        running_count = game[3] #update the counts from the game
+        true_count = game[4]
+
+        # Determine if there are enough cards to play another round
+        if len(deck) < cut:
+            break
+    return [list(wins), list(draw), list(loss), rounds_played]
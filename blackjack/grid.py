@@ -0,0 +1,200 @@
+# Sweep over a grid of settings: limit, number of decks, cut (or
+# penetration), rec_rounds and strategy. Every grid cell is a sweep of its
+# own, but the shoes are shared: a work unit is one block of shoes for a
+# deck count, dealt once and played with every limit and cut still to do
+# and every strategy in lockstep, rec_rounds only changes what is read off
+# the results. The block seeds are the sweep's, so a cell gives the same
+# numbers as sweep() with those settings.
+#
+# Finished cells are saved to a JSON results file as soon as all their
+# blocks are in, cells that are already in it are skipped next time.
+#
+#   python -m blackjack.grid --limits 14 15 16 17 --decks 2 6 8 --cuts 12 52 --shoes 10000
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .batch import MIN_CUT, last_rounds, play_strategies, tallies
+from .counting import STRATEGIES
+from .shoes import block_rng, create_shoes
+from .stats import RunningStats
+
+
+# Name of a cell in the results file
+def cell_key(strategy, limit, number_decks, cut, rec_rounds, games_sim, seed, block_size):
+    return (f"{strategy}|limit={limit}|decks={number_decks}|cut={cut}|rec_rounds={rec_rounds}"
+            f"|shoes={games_sim}|seed={seed}|block={block_size}")
+
+# Cards left at the cut for a penetration (share of the shoe dealt)
+def penetration_cut(number_decks, penetration):
+    return int(round(52*number_decks*(1 - penetration)))
+
+def load_results(path):
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(path, results):
+    temp = path + '.tmp'
+    with open(temp, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    os.replace(temp, path)
+
+
+# Every cell of the grid: {key: (strategy, limit, number_decks, cut, rec_rounds)}.
+# cuts is cards left at the cut, penetrations the share of the shoe dealt
+# (turned into a cut for every deck count), give one or the other. Cuts
+# under MIN_CUT play like MIN_CUT and are keyed as it, so they're one cell
+def expand(strategies, limits, decks, rec_rounds, games_sim, seed, block_size, cuts=None, penetrations=None):
+    cells = {}
+    for number_decks in decks:
+        deck_cuts = cuts if penetrations is None else [penetration_cut(number_decks, p) for p in penetrations]
+        deck_cuts = [max(cut, MIN_CUT) for cut in deck_cuts]
+        for strategy, limit, cut, rec in itertools.product(strategies, limits, deck_cuts, rec_rounds):
+            key = cell_key(strategy, limit, number_decks, cut, rec, games_sim, seed, block_size)
+            cells[key] = (strategy, limit, number_decks, cut, rec)
+    return cells
+
+# Work units for the cells still to do, biggest first: (number_decks, block,
+# (cut, limit) pairs to play, strategies, rec_rounds) and an estimate of the
+# cards it deals
+def schedule(cells, games_sim, block_size):
+    todo = {}
+    for strategy, limit, number_decks, cut, rec in cells.values():
+        plays = todo.setdefault(number_decks, {})
+        plays.setdefault((cut, limit), [set(), set()])
+        plays[cut, limit][0].add(strategy)
+        plays[cut, limit][1].add(rec)
+    units = []
+    for number_decks, plays in todo.items():
+        plays = tuple((cut, limit, tuple(sorted(s)), tuple(sorted(r))) for (cut, limit), (s, r) in sorted(plays.items()))
+        for block in range((games_sim + block_size - 1)//block_size):
+            shoes = min(block_size, games_sim - block*block_size)
+            cost = shoes*number_decks*sum(len(p[2]) for p in plays)
+            units.append((cost, (number_decks, block, plays)))
+    units.sort(key=lambda u: -u[0])
+    return [unit for _, unit in units]
+
+
+# Play one unit, returns {(strategy, limit, cut, rec_rounds): (stats, tallies)}
+# for the block, stats as (count, mean, m2) and tallies as rounds, wins,
+# losses and draws
+def run_grid_unit(unit, games_sim, seed, block_size):
+    number_decks, block, plays = unit
+    shoes = create_shoes(min(block_size, games_sim - block*block_size), number_decks, block_rng(seed, block))
+    out = {}
+    for cut, limit, strategies, recs in plays:
+        played = play_strategies(shoes, limit, strategies, cut)
+        for s in strategies:
+            wins, losses, draws = (int(t.sum()) for t in tallies(played[s]))
+            counts = (int(played[s].rounds.sum()), wins, losses, draws)
+            for rec in recs:
+                st = RunningStats()
+                st.add_many(last_rounds(played[s], rec)/rec)
+                out[s, limit, cut, rec] = ((st.count, st.mean, st.m2), counts)
+    return out
+
+
+# Run every cell of the grid that isn't in the results file yet, returns
+# all the cells' results. A cell's stats are merged block by block in
+# order, so they don't depend on which worker finished first
+def run_grid(strategies=None, limits=(16,), decks=(6,), cuts=(12,), rec_rounds=(10,), games_sim=1000,
+             seed=0, block_size=1000, workers=None, results=None, penetrations=None, progress=None):
+    strategies = list(STRATEGIES if strategies is None else strategies)
+    cells = expand(strategies, limits, decks, rec_rounds, games_sim, seed, block_size, cuts, penetrations)
+    saved = load_results(results)
+    todo = {key: cell for key, cell in cells.items() if key not in saved}
+    units = schedule(todo, games_sim, block_size)
+    blocks = (games_sim + block_size - 1)//block_size
+
+    parts = {key: [None]*blocks for key in todo}
+    waiting = {key: blocks for key in todo}
+
+    def fold(unit, out):
+        number_decks, block, _ = unit
+        for (strategy, limit, cut, rec), part in out.items():
+            key = cell_key(strategy, limit, number_decks, cut, rec, games_sim, seed, block_size)
+            if key not in parts:
+                continue
+            parts[key][block] = part
+            waiting[key] -= 1
+            if not waiting[key]:
+                saved[key] = _summary(todo[key], parts.pop(key))
+                if results is not None:
+                    save_results(results, saved)
+        if progress is not None:
+            progress(unit)
+
+    if workers == 1:
+        for unit in units:
+            fold(unit, run_grid_unit(unit, games_sim, seed, block_size))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_grid_unit, unit, games_sim, seed, block_size): unit for unit in units}
+            for future in as_completed(futures):
+                fold(futures[future], future.result())
+    return {key: saved[key] for key in cells}
+
+# What gets saved for a finished cell
+def _summary(cell, parts):
+    strategy, limit, number_decks, cut, rec = cell
+    st = RunningStats()
+    rounds = wins = losses = draws = 0
+    for (count, mean, m2), (r, w, l, d) in parts:
+        block = RunningStats()
+        block.count, block.mean, block.m2 = count, mean, m2
+        st.merge(block)
+        rounds, wins, losses, draws = rounds + r, wins + w, losses + l, draws + d
+    low, high = st.interval()
+    return {'strategy': strategy, 'limit': limit, 'number_decks': number_decks, 'cut': cut,
+            'rec_rounds': rec, 'shoes': st.count, 'mean': st.mean, 'std': st.std, 'low': low, 'high': high,
+            'rounds': rounds, 'wins': wins, 'losses': losses, 'draws': draws}
+
+
+# The best cell for every strategy, by mean win and draw rate
+def best_cells(cells):
+    best = {}
+    for cell in cells.values():
+        if cell['strategy'] not in best or cell['mean'] > best[cell['strategy']]['mean']:
+            best[cell['strategy']] = cell
+    return best
+
+def print_cells(cells):
+    print(f"{'strategy':<22}{'limit':>6}{'decks':>6}{'cut':>5}{'rec':>5}{'shoes':>9}{'win+draw %':>12}  95% interval")
+    for cell in sorted(cells, key=lambda c: (c['strategy'], -c['mean'])):
+        print(f"{cell['strategy']:<22}{cell['limit']:>6}{cell['number_decks']:>6}{cell['cut']:>5}"
+              f"{cell['rec_rounds']:>5}{cell['shoes']:>9}{cell['mean']*100:>12.4f}  "
+              f"[{cell['low']*100:.2f}, {cell['high']*100:.2f}]")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m blackjack.grid',
+                                     description='Sweep a grid of limits, deck counts, cuts and strategies.')
+    parser.add_argument('--strategies', nargs='+', metavar='NAME', choices=list(STRATEGIES))
+    parser.add_argument('--limits', nargs='+', type=int, default=[16])
+    parser.add_argument('--decks', nargs='+', type=int, default=[6])
+    cut = parser.add_mutually_exclusive_group()
+    cut.add_argument('--cuts', nargs='+', type=int, default=[12], help='cards left at the cut')
+    cut.add_argument('--penetrations', nargs='+', type=float, help='share of the shoe dealt, e.g. 0.75')
+    parser.add_argument('--rec-rounds', nargs='+', type=int, default=[10])
+    parser.add_argument('--shoes', type=int, default=1000, help='shoes per cell (default 1000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--block-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--results', default='grid.json', help='results file, finished cells are skipped')
+    parser.add_argument('--best', action='store_true', help='only show the best cell of every strategy')
+    args = parser.parse_args(argv)
+
+    cells = run_grid(args.strategies, args.limits, args.decks, args.cuts, args.rec_rounds, args.shoes,
+                     args.seed, args.block_size, args.workers, args.results, args.penetrations)
+    print_cells((best_cells(cells) if args.best else cells).values())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# A hand of cards that keeps its total as cards are added, so nothing has to
+# be re-summed. Aces count eleven until check_if_ace turns one into a one,
+# the same way the 'A' -> 'A.' swap worked on the old lists of strings.
+
+from . import instrument
+from .cards import ACE, CARD_VALUES
+
+
+class Hand:
+    __slots__ = ('total', 'aces', 'size', 'first', 'last')
+
+    def __init__(self):
+        self.total = 0     # sum of the cards, Aces still eleven are counted as 11
+        self.aces = 0      # Aces still counted as eleven
+        self.size = 0      # number of cards
+        self.first = None  # rank of the first card, the dealer's shown card
+        self.last = None   # rank of the newest card
+
+    def add(self, card):
+        self.total += CARD_VALUES[card]
+        if card == ACE:
+            self.aces += 1
+        if self.size == 0:
+            self.first = card
+        self.size += 1
+        self.last = card
+        return self
+
+    # Deals a card, default is one incase you want to hit
+    @instrument.probe('deal')
+    def deal(self, deck, number_of_cards=1):
+        for _ in range(number_of_cards):
+            self.add(deck.pop()) #take a card off the deck and move it into the hand
+        return self
+
+    # Turns one Ace that is still eleven into a one, False if there isn't one
+    @instrument.probe('ace check', 'soft ace')
+    def check_if_ace(self):
+        if self.aces:
+            self.aces -= 1
+            self.total -= 10
+            return True
+        return False
+
+    # Value of the first card, what the player sees of the dealer's hand
+    @property
+    def up_card(self):
+        return CARD_VALUES[self.first]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"Hand(total={self.total}, aces={self.aces}, size={self.size})"
@@ -0,0 +1,233 @@
+# Outcome histograms by true count, collected while the shoes are played.
+# Every round result and every player decision goes into a fixed size
+# counter keyed by (strategy, true count bucket, player total, dealer up
+# card), so one run gives how the edge moves with the count for every cell
+# and, for the decisions, what hitting and what staying would have got
+# there (both are played out from the same cards). That is the table the
+# index plays for player_turn come from: the true count where staying
+# starts to beat hitting for a total against an up card.
+#
+# The counters are plain integers, merging runs (or workers) is adding
+# them up, and they are saved as a compressed .npz.
+#
+#   python -m blackjack.histogram --shoes 100000 --out counts.npz
+#   python -m blackjack.histogram --merge a.npz b.npz --out counts.npz --strategies 'Hi-Lo (Most Common)'
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .batch import LOSS, WIN, play_strategies
+from .counting import STRATEGIES
+from .decisions import BUCKETS, TC_RANGE
+from .shoes import block_rng, create_shoes
+
+# Player totals go up to 30 (hard 20 hitting a ten), up cards are 2 to 11
+TOTALS = 32
+UP_CARDS = 10
+# Decision branches
+STAY, HIT = 0, 1
+
+
+# True counts to buckets, the same ones decisions.tc_bucket gives
+def tc_buckets(true_count):
+    return np.clip(true_count, -TC_RANGE, TC_RANGE).astype(np.int64) + TC_RANGE
+
+
+# Counters for one or more strategies:
+#   rounds     [strategy, bucket of the count before the deal, final total, up card, win/loss/draw]
+#   decisions  [strategy, bucket, total, up card, stay/hit, win/loss/draw]
+#              what staying and what hitting would have got at every decision
+#   taken      [strategy, bucket, total, up card, stay/hit] what the strategy did
+class CountHistogram:
+    def __init__(self, strategies, settings=None):
+        self.strategies = list(strategies)
+        self.settings = dict(settings or {})
+        cells = (len(self.strategies), BUCKETS, TOTALS, UP_CARDS)
+        self.rounds = np.zeros(cells + (3,), dtype=np.int64)
+        self.decisions = np.zeros(cells + (2, 3), dtype=np.int64)
+        self.taken = np.zeros(cells + (2,), dtype=np.int64)
+
+    # Called by play_shoes for every round that ends, rounds without a result are left out
+    def add_rounds(self, strategy, true_count, total, up_card, result):
+        result = np.broadcast_to(result, np.shape(strategy))
+        keep = result >= 0
+        np.add.at(self.rounds, (strategy[keep], tc_buckets(true_count[keep]), total[keep],
+                                up_card[keep] - 2, result[keep]), 1)
+
+    # Called by play_shoes at every player decision with the strategy's move
+    # and the result of the round for staying and for hitting
+    def add_decisions(self, strategy, true_count, total, up_card, hit, stay_result, hit_result):
+        cell = (strategy, tc_buckets(true_count), total, up_card - 2)
+        np.add.at(self.taken, cell + (hit.astype(np.int64),), 1)
+        for branch, result in ((STAY, stay_result), (HIT, hit_result)):
+            keep = result >= 0
+            np.add.at(self.decisions, tuple(c[keep] for c in cell) + (branch, result[keep]), 1)
+
+    # Add another histogram's counts, strategies are matched by name
+    def merge(self, other):
+        if self.settings and other.settings and self.settings != other.settings:
+            raise ValueError("histograms from different settings can't be merged")
+        self.settings = self.settings or other.settings
+        for i, name in enumerate(other.strategies):
+            if name not in self.strategies:
+                self.strategies.append(name)
+                for field in ('rounds', 'decisions', 'taken'):
+                    counts = getattr(self, field)
+                    setattr(self, field, np.concatenate([counts, np.zeros_like(counts[:1])]))
+            j = self.strategies.index(name)
+            self.rounds[j] += other.rounds[i]
+            self.decisions[j] += other.decisions[i]
+            self.taken[j] += other.taken[i]
+        return self
+
+    def save(self, path):
+        temp = path + '.tmp'
+        with open(temp, 'wb') as f:
+            np.savez_compressed(f, meta=np.array(json.dumps({'strategies': self.strategies,
+                                                             'settings': self.settings})),
+                                rounds=self.rounds, decisions=self.decisions, taken=self.taken)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            hist = cls(meta['strategies'], meta['settings'])
+            hist.rounds, hist.decisions, hist.taken = data['rounds'], data['decisions'], data['taken']
+        return hist
+
+
+# Expected result per unit bet of counts along the last axis (win, loss, draw)
+def _edge(counts):
+    played = counts.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (counts[..., WIN] - counts[..., LOSS])/played, played
+
+# The strategy's edge at every count bucket, summed over totals and up
+# cards: {true count: (edge, rounds)}, only buckets that have rounds.
+# The ends stand for that count or beyond
+def count_edge(hist, strategy):
+    counts = hist.rounds[hist.strategies.index(strategy)].sum(axis=(1, 2))
+    edge, played = _edge(counts)
+    return {b - TC_RANGE: (edge[b], int(played[b])) for b in range(BUCKETS) if played[b]}
+
+# Hitting's edge over staying for a total against an up card at every
+# count bucket (nan where there were no decisions)
+def hit_gain(hist, strategy, total, up_card):
+    counts = hist.decisions[hist.strategies.index(strategy), :, total, up_card - 2]
+    edge, _ = _edge(counts)
+    return edge[:, HIT] - edge[:, STAY]
+
+# Index plays: for every total and up card with at least min_decisions in
+# each bucket used, the lowest true count from which staying beats hitting
+# at every higher count, {(total, up card): count}. A total that should be
+# stood on at every count seen gets -TC_RANGE, one that never should gets None
+def index_plays(hist, strategy, min_decisions=100, totals=range(12, 21)):
+    plays = {}
+    decisions = hist.decisions[hist.strategies.index(strategy)]
+    for total in totals:
+        for up_card in range(2, 12):
+            counts = decisions[:, total, up_card - 2]
+            enough = counts.sum(axis=-1).min(axis=-1) >= min_decisions
+            if not enough.any():
+                continue
+            stay_better = hit_gain(hist, strategy, total, up_card) < 0
+            used = np.flatnonzero(enough)
+            index = None
+            for b in used[::-1]:
+                if not stay_better[b]:
+                    break
+                index = b - TC_RANGE
+            # staying wins at every count that was seen
+            if index == used[0] - TC_RANGE:
+                index = -TC_RANGE
+            plays[total, up_card] = index
+    return plays
+
+
+# Play one block of the sweep's shoes with the strategies and count them
+def run_block(strategies, block, games_sim, limit=16, number_decks=6, cut=12, seed=0, block_size=1000):
+    hist = CountHistogram(strategies)
+    shoes = create_shoes(min(block_size, games_sim - block*block_size), number_decks, block_rng(seed, block))
+    play_strategies(shoes, limit, strategies, cut, histogram=hist)
+    return hist
+
+# Histograms of games_sim shoes (the sweep's shoes for the seed) for every
+# strategy. Blocks are added up as they finish, integer counts don't care
+# about the order
+def collect(strategies=None, games_sim=1000, limit=16, number_decks=6, cut=12, seed=0, block_size=1000,
+            workers=1):
+    strategies = list(STRATEGIES if strategies is None else strategies)
+    settings = dict(limit=limit, number_decks=number_decks, cut=cut)
+    hist = CountHistogram(strategies, settings)
+    blocks = range((games_sim + block_size - 1)//block_size)
+    args = (games_sim, limit, number_decks, cut, seed, block_size)
+    if workers == 1:
+        for block in blocks:
+            hist.merge(run_block(strategies, block, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(run_block, strategies, block, *args) for block in blocks]):
+                hist.merge(future.result())
+    return hist
+
+
+def print_index_plays(hist, strategy, min_decisions=100):
+    plays = index_plays(hist, strategy, min_decisions)
+    print(f"{strategy}: stay from this true count up ('-' never, blank too few decisions)")
+    print('total ' + ''.join(f"{'A' if up == 11 else up:>5}" for up in range(2, 12)))
+    for total in sorted({t for t, _ in plays}):
+        cells = []
+        for up in range(2, 12):
+            if (total, up) not in plays:
+                cells.append('')
+            else:
+                index = plays[total, up]
+                cells.append('-' if index is None else 'all' if index == -TC_RANGE else f"{index:+d}")
+        print(f"{total:>5} " + ''.join(f"{c:>5}" for c in cells))
+
+def print_count_edge(hist, strategy):
+    edges = count_edge(hist, strategy)
+    print('  '.join(f"{tc:+d}: {edge*100:+.2f}% ({n})" for tc, (edge, n) in edges.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m blackjack.histogram',
+                                     description='Outcome histograms by true count and the index plays from them.')
+    parser.add_argument('--strategies', nargs='+', metavar='NAME', choices=list(STRATEGIES))
+    parser.add_argument('--limit', type=int, default=16)
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--cut', type=int, default=12)
+    parser.add_argument('--shoes', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--block-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--merge', nargs='+', metavar='NPZ', help='add up saved histograms instead of playing')
+    parser.add_argument('--out', metavar='NPZ', help='save the histogram here')
+    parser.add_argument('--min-decisions', type=int, default=100,
+                        help='decisions a count bucket needs to be used for the index plays (default 100)')
+    args = parser.parse_args(argv)
+
+    if args.merge:
+        hist = CountHistogram.load(args.merge[0])
+        for path in args.merge[1:]:
+            hist.merge(CountHistogram.load(path))
+    else:
+        hist = collect(args.strategies, args.shoes, args.limit, args.decks, args.cut, args.seed,
+                       args.block_size, args.workers)
+    if args.out:
+        hist.save(args.out)
+    for strategy in args.strategies or hist.strategies:
+        print_count_edge(hist, strategy)
+        print_index_plays(hist, strategy, args.min_decisions)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# Opt-in timers and counters for the hot paths.
+#
+# Functions are registered with @probe('phase name'). While instrumentation
+# is off nothing changes, the engine calls the plain functions. enable()
+# swaps timed wrappers into every blackjack module (and class) that holds
+# the function and disable() puts the originals back, so leaving it in
+# production runs costs nothing. Code that isn't a function of its own can
+# check instrument.enabled and use start/stop or count directly.
+# Sweep workers in other processes keep their own records, use workers=1
+# or merge() their reports.
+#
+#   from blackjack import instrument
+#   instrument.enable()
+#   ... run a sweep with workers=1 ...
+#   instrument.disable()
+#   instrument.write_json('profile.json')
+#   instrument.write_folded('profile.folded')   # flamegraph.pl / speedscope
+
+import json
+import sys
+import time
+from functools import wraps
+
+enabled = False
+
+_probes = []     # (qualified name, function, phase, event)
+_timers = {}     # phase -> [calls, seconds]
+_counters = {}   # event -> count
+_stacks = {}     # 'outer;inner' -> seconds spent in inner itself
+_open = []       # phases that are running: [name, started, seconds in children]
+
+
+# Register a function (or method) as a phase. event is a counter that goes
+# up by one every call, except calls that return False
+def probe(phase, event=None):
+    def register(func):
+        _probes.append((func.__qualname__, func, phase, event))
+        return func
+    return register
+
+def start(phase):
+    _open.append([phase, time.perf_counter(), 0.0])
+
+def stop():
+    phase, started, children = _open.pop()
+    elapsed = time.perf_counter() - started
+    timer = _timers.setdefault(phase, [0, 0.0])
+    timer[0] += 1
+    timer[1] += elapsed
+    key = ';'.join([p[0] for p in _open] + [phase])
+    _stacks[key] = _stacks.get(key, 0.0) + elapsed - children
+    if _open:
+        _open[-1][2] += elapsed
+
+def count(event, n=1):
+    _counters[event] = _counters.get(event, 0) + n
+
+
+def _timed(func, phase, event):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start(phase)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            stop()
+        if event is not None and result is not False:
+            count(event)
+        return result
+    wrapper.original = func
+    return wrapper
+
+# Every name the wrappers were put in, so disable() can put the originals back
+_swapped = []    # (module or class, attribute, original function)
+
+def _replace(owner, attr, func, wrapper):
+    setattr(owner, attr, wrapper)
+    _swapped.append((owner, attr, func))
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    modules = [m for name, m in list(sys.modules.items()) if name.split('.')[0] == 'blackjack']
+    for qualname, func, phase, event in _probes:
+        wrapper = _timed(func, phase, event)
+        if '.' in qualname:
+            # a method lives on its class
+            cls, attr = qualname.rsplit('.', 1)
+            _replace(getattr(sys.modules[func.__module__], cls), attr, func, wrapper)
+            continue
+        # a function can be in any module that imported it
+        for module in modules:
+            for attr, value in list(vars(module).items()):
+                if value is func:
+                    _replace(module, attr, func, wrapper)
+    enabled = True
+
+def disable():
+    global enabled
+    for owner, attr, func in reversed(_swapped):
+        setattr(owner, attr, func)
+    _swapped.clear()
+    enabled = False
+
+def reset():
+    _timers.clear()
+    _counters.clear()
+    _stacks.clear()
+    _open.clear()
+
+
+# Everything recorded so far
+def report():
+    return {
+        'phases': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in _timers.items()},
+        'events': dict(_counters),
+        'stacks': dict(_stacks),
+    }
+
+# Add a report from another process (e.g. a sweep worker) to this one
+def merge(other):
+    for name, timer in other['phases'].items():
+        mine = _timers.setdefault(name, [0, 0.0])
+        mine[0] += timer['calls']
+        mine[1] += timer['seconds']
+    for name, n in other['events'].items():
+        count(name, n)
+    for key, seconds in other['stacks'].items():
+        _stacks[key] = _stacks.get(key, 0.0) + seconds
+
+def write_json(path):
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+
+# Folded stacks, one 'outer;inner microseconds' line per stack
+def write_folded(path):
+    with open(path, 'w') as f:
+        for key, seconds in sorted(_stacks.items()):
+            f.write(f"{key} {round(seconds*1e6)}\n")
+
+def print_report():
+    print(f"{'phase':<18}{'calls':>12}{'seconds':>12}{'us/call':>10}")
+    for name, (calls, seconds) in sorted(_timers.items(), key=lambda t: -t[1][1]):
+        print(f"{name:<18}{calls:>12}{seconds:>12.3f}{seconds/calls*1e6:>10.2f}")
+    for name, n in sorted(_counters.items()):
+        print(f"{name:<18}{n:>12}")
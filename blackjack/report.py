@@ -0,0 +1,49 @@
+# Reporting: showing the strategy table and plotting sweep results.
+# pandas and matplotlib are only imported in here, and only when used.
+
+from .cards import RANKS
+from .counting import STRATEGIES, STRATEGY_FILE
+
+
+# The card counting table as a DataFrame, laid out like the write-up's
+# (with the 'A.' column, an Ace turned into a one counts the same as 'A')
+def strategy_frame():
+    import pandas as pd
+    columns = list(RANKS) + ['A.']
+    return pd.DataFrame([list(map(float, row)) + [float(row[-1])] for row in STRATEGIES.values()],
+                        index=list(STRATEGIES), columns=columns)
+
+# Save the table as the pickle the write-up uses
+def write_strategy_file(path=STRATEGY_FILE):
+    strategy_frame().to_pickle(path)
+
+
+# The graph from the write-up. shoes is the shoe number of every point on
+# the curves, by default every shoe (see stats.curve_shoes for shorter ones),
+# or {strategy: shoe numbers} when the curves have different lengths
+def plot_results(results, shoes=None, path=None):
+    import matplotlib
+    if path is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(16,8))
+
+    # Plotting the results for each strategies
+    last = 0
+    for i in results:
+        x = shoes.get(i) if isinstance(shoes, dict) else shoes
+        if x is None:
+            x = range(1, len(results[i]) + 1)
+        plt.plot(x, results[i], label=i+': '+str(results[i][-1])+'%')
+        last = max(last, x[-1])
+    plt.title("Blackjack Win Probability") #title
+    plt.ylabel("Percentage Won/Draws") #y-axis label
+    plt.xlabel("Number of Games Played") #x-axis label
+    plt.ylim([48,54]) #bounds of y-axis
+    plt.xlim([min(100, last//10),last]) #bounds of x-axis
+    plt.legend()
+    if path is None:
+        plt.show() #display graph
+    else:
+        plt.savefig(path)
@@ -0,0 +1,157 @@
+# Blackjack with the full rules: doubling, splitting (and re-splitting) and
+# surrender, played from the compiled basic strategy tables in decisions.py.
+# Unlike the write-up's game (game.py) this one plays like a casino: the
+# dealer peeks for blackjack, a natural pays 3:2 and hitting to 21 doesn't
+# win by itself. Results are in units of the first bet of the round.
+
+from collections import namedtuple
+
+from . import instrument
+from .cards import ACE, CARD_VALUES, RANKS
+from .decisions import (CAN_DOUBLE, CAN_SURRENDER, DOUBLE, HARD, OPTIONS, PAIR, SOFT, SPLIT, STAND,
+                        SURRENDER, TOTALS, basic_table, tc_bucket)
+from .game import COUNT_ROWS, create_deck, true_counter
+from .hand import Hand
+
+# Table rules, the defaults are a common six deck game
+Rules = namedtuple('Rules', 'blackjack_pays hit_soft_17 double_after_split max_hands resplit_aces hit_split_aces surrender',
+                   defaults=(1.5, False, True, 4, False, False, True))
+RULES = Rules()
+
+# Size of one true count bucket and one set of options in the table
+_BUCKET = OPTIONS*3*TOTALS*len(RANKS)
+_OPTIONS = 3*TOTALS*len(RANKS)
+
+
+# Raised when the shoe runs out in the middle of a round
+class ShoeEmpty(Exception):
+    pass
+
+def _draw(hand, deck):
+    if not deck:
+        raise ShoeEmpty
+    hand.deal(deck)
+    while hand.total > 21 and hand.check_if_ace():
+        pass
+
+
+# The player's action for a hand from the table
+@instrument.probe('player decision')
+def decide(hand, up_card, options, hands, rules, table, true_count):
+    total = hand.total
+    if hand.size == 2 and CARD_VALUES[hand.first] == CARD_VALUES[hand.last] and hands < rules.max_hands:
+        hand_class, total = PAIR, CARD_VALUES[hand.first]
+    else:
+        hand_class = SOFT if hand.aces else HARD
+    return table[tc_bucket(true_count)*_BUCKET + options*_OPTIONS + (hand_class*TOTALS + total)*len(RANKS) + up_card]
+
+
+# Play a round: returns [net result, amount bet, running count, true count],
+# both in units of the first bet
+@instrument.probe('round', 'hand')
+def play_round(deck, running_count, strategy, table=None, rules=RULES):
+    if table is None:
+        table = basic_table()
+    row = COUNT_ROWS[strategy]
+    player, dealer = Hand(), Hand()
+    _draw(player, deck)
+    _draw(player, deck)
+    _draw(dealer, deck)
+    _draw(dealer, deck)
+    up_card = dealer.first
+
+    # The dealer's second card stays hidden for now
+    running_count += row[player.first] + row[player.last] + row[up_card]
+
+    # Naturals, the dealer peeks when they show an Ace or a ten
+    if player.total == 21 or dealer.total == 21:
+        running_count += row[dealer.last]
+        if player.total == dealer.total:
+            net = 0.0
+        else:
+            net = rules.blackjack_pays if player.total == 21 else -1.0
+        return [net, 1.0, running_count, true_counter(deck, running_count)]
+
+    # Every hand the player ends up with and its bet, split hands are
+    # added after the one they came from and played in order
+    hands, bets = [player], [1.0]
+    i = 0
+    while i < len(hands):
+        hand = hands[i]
+        split = len(hands) > 1
+        if hand.size == 1:
+            _draw(hand, deck)
+            running_count += row[hand.last]
+        split_aces = split and hand.first == ACE
+        while hand.total < 21:
+            options = 0
+            if hand.size == 2 and not split_aces:
+                if not split or rules.double_after_split:
+                    options |= CAN_DOUBLE
+                if not split and rules.surrender:
+                    options |= CAN_SURRENDER
+            action = decide(hand, up_card, options, len(hands), rules, table, true_counter(deck, running_count))
+            # split Aces get one card each unless they can be split again
+            if split_aces and not rules.hit_split_aces and not (action == SPLIT and rules.resplit_aces):
+                break
+
+            if action == STAND:
+                break
+            if action == SURRENDER:
+                # the dealer takes half the bet, the hidden card is never shown
+                return [-0.5, 1.0, running_count, true_counter(deck, running_count)]
+            if action == SPLIT:
+                hands[i], second = Hand().add(hand.first), Hand().add(hand.last)
+                hands.insert(i + 1, second)
+                hand = hands[i]
+                bets.insert(i + 1, bets[i])
+                _draw(hand, deck)
+                running_count += row[hand.last]
+                split, split_aces = True, hand.first == ACE
+                continue
+            _draw(hand, deck)
+            running_count += row[hand.last]
+            if action == DOUBLE:
+                bets[i] *= 2
+                break
+        i += 1
+
+    # The dealer shows their card and plays if any hand is still in
+    running_count += row[dealer.last]
+    if any(hand.total <= 21 for hand in hands):
+        while dealer.total < 17 or (rules.hit_soft_17 and dealer.total == 17 and dealer.aces):
+            _draw(dealer, deck)
+            running_count += row[dealer.last]
+
+    net = 0.0
+    for hand, bet in zip(hands, bets):
+        if hand.total > 21 or (dealer.total <= 21 and dealer.total > hand.total):
+            net -= bet
+        elif dealer.total > 21 or hand.total > dealer.total:
+            net += bet
+    return [net, sum(bets), running_count, true_counter(deck, running_count)]
+
+
+# Play a whole shoe with the full rules until fewer than cut cards are left,
+# a round the shoe runs out in has no result. Returns the net result, the
+# amount bet and the true count before the deal (what a bet would be sized
+# on) of every round and the number of rounds
+@instrument.probe('shoe')
+def play_shoe(strategy, table=None, rules=RULES, deck=None, number_decks=6, cut=12):
+    if deck is None:
+        deck = create_deck(number_decks)
+    if table is None:
+        table = basic_table()
+    nets, bets, counts = [], [], []
+    running_count = true_count = 0
+
+    while len(deck) >= cut:
+        try:
+            net, bet, next_count, next_true = play_round(deck, running_count, strategy, table, rules)
+        except ShoeEmpty:
+            break
+        nets.append(net)
+        bets.append(bet)
+        counts.append(true_count)
+        running_count, true_count = next_count, next_true
+    return [nets, bets, counts, len(nets)]
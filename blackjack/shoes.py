@@ -0,0 +1,93 @@
+# Whole shoes as numpy arrays of rank codes, one shoe per row
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import instrument
+from .cards import CARD_VALUES, RANKS
+
+# Face values as an array so a whole column of cards can be looked up at once
+VALUES = np.array(CARD_VALUES, dtype=np.int16)
+
+# Convert a shoe's ranks (in the order they are dealt) into a deck list that
+# Hand.deal can use, it pops from the end so the last card in the list comes out first
+def decode_deck(ranks):
+    return np.asarray(ranks)[::-1].tolist()
+
+# Make n shuffled shoes at once, one shoe per row, dealt left to right
+@instrument.probe('shuffle')
+def create_shoes(n, number_decks=6, rng=None):
+    if instrument.enabled:
+        instrument.count('reshuffle', n)
+    rng = np.random.default_rng(rng)
+    shoe = np.repeat(np.arange(len(RANKS), dtype=np.int8), 4*number_decks)
+    return rng.permuted(np.tile(shoe, (n, 1)), axis=1)
+
+# Random numbers for one block of a sweep's shoes, independent of every other block
+def block_rng(seed, block):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+
+
+# Shuffled shoes made up front in one block of shared memory, one shoe per
+# row. Pickling a pool only sends its name, so worker processes read the
+# same memory and nothing is copied. Pools from for_sweep hold exactly the
+# shoes sweep() deals for that seed, so every engine and every worker can
+# play the same shoes. The process that made the pool frees it on close()
+class ShoePool:
+    def __init__(self, n, number_decks=6, name=None):
+        self.n, self.number_decks = n, number_decks
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=max(1, n*52*number_decks))
+        self.shoes = np.ndarray((n, 52*number_decks), dtype=np.int8, buffer=self.memory.buf)
+
+    # n shoes shuffled by rng, made chunk shoes at a time
+    @classmethod
+    def random(cls, n, number_decks=6, rng=None, chunk=10000):
+        pool = cls(n, number_decks)
+        rng = np.random.default_rng(rng)
+        for start in range(0, n, chunk):
+            stop = min(n, start + chunk)
+            pool.shoes[start:stop] = create_shoes(stop - start, number_decks, rng)
+        return pool
+
+    # The shoes of sweep(games_sim=..., number_decks=..., seed=..., block_size=...)
+    @classmethod
+    def for_sweep(cls, games_sim, number_decks=6, seed=0, block_size=1000):
+        pool = cls(games_sim, number_decks)
+        for start in range(0, games_sim, block_size):
+            stop = min(games_sim, start + block_size)
+            pool.shoes[start:stop] = create_shoes(stop - start, number_decks, block_rng(seed, start//block_size))
+        return pool
+
+    # Shoe i as a deck list for play_blackjack, popping off the end of it
+    # moves through the shoe in order like a cursor
+    def deck(self, i):
+        return self.shoes[i, ::-1].tolist()
+
+    def __len__(self):
+        return self.n
+
+    def __reduce__(self):
+        return _attach, (self.n, self.number_decks, self.memory.name)
+
+    def close(self):
+        self.shoes = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Pools this process has attached to, so every task sent to a worker with
+# the same pool reuses the first mapping
+_attached = {}
+
+def _attach(n, number_decks, name):
+    if name not in _attached:
+        _attached[name] = ShoePool(n, number_decks, name)
+    return _attached[name]
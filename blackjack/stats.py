@@ -0,0 +1,121 @@
+# Streaming statistics so long sweeps don't keep a list entry for every round.
+# Everything here uses the same amount of memory no matter how many shoes
+# are simulated.
+
+import math
+from collections import deque
+
+
+# Count, mean and variance updated one value (or one batch) at a time,
+# Welford's method so the variance doesn't lose precision on long runs
+class RunningStats:
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0   # sum of squared differences from the mean
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta/self.count
+        self.m2 += delta*(x - self.mean)
+
+    # Add a whole array, the batch's own mean and variance are merged in
+    def add_many(self, values):
+        import numpy as np
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            batch = RunningStats()
+            batch.count = values.size
+            batch.mean = float(values.mean())
+            batch.m2 = float(((values - batch.mean)**2).sum())
+            self.merge(batch)
+
+    # Combine with the stats of another run (Chan et al. parallel formula)
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta*other.count/count
+        self.m2 += other.m2 + delta*delta*self.count*other.count/count
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        return self.m2/(self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    # Normal confidence interval for the mean, default is 95%
+    def interval(self, z=1.96):
+        half = z*self.std/math.sqrt(self.count) if self.count > 1 else float('nan')
+        return self.mean - half, self.mean + half
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean:.6g}, std={self.std:.6g})"
+
+
+# Running stats of two series observed in pairs (the same shoe played two
+# ways) and their covariance, merged the same way as RunningStats
+class RunningPairs:
+    __slots__ = ('x', 'y', 'cxy')
+
+    def __init__(self):
+        self.x = RunningStats()
+        self.y = RunningStats()
+        self.cxy = 0.0  # sum of products of differences from the means
+
+    def add_many(self, x, y):
+        import numpy as np
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.size:
+            batch = RunningPairs()
+            batch.x.add_many(x)
+            batch.y.add_many(y)
+            batch.cxy = float(((x - batch.x.mean)*(y - batch.y.mean)).sum())
+            self.merge(batch)
+
+    def merge(self, other):
+        count = self.x.count + other.x.count
+        if count:
+            self.cxy += other.cxy + ((other.x.mean - self.x.mean)*(other.y.mean - self.y.mean)
+                                     *self.x.count*other.x.count/count)
+        self.x.merge(other.x)
+        self.y.merge(other.y)
+        return self
+
+    @property
+    def covariance(self):
+        return self.cxy/(self.x.count - 1) if self.x.count > 1 else float('nan')
+
+    @property
+    def correlation(self):
+        return self.covariance/(self.x.std*self.y.std)
+
+
+# Keeps only the last n results, play_blackjack's lists without the history
+class LastRounds:
+    __slots__ = ('wins', 'loss', 'draw')
+
+    def __init__(self, n):
+        self.wins = deque(maxlen=n)
+        self.loss = deque(maxlen=n)
+        self.draw = deque(maxlen=n)
+
+
+# Which shoes get a point on the results curve: every shoe by default,
+# otherwise about points evenly spaced ones so the curve has a fixed size
+def curve_shoes(games_sim, points=None):
+    import numpy as np
+    stride = 1 if points is None else max(1, -(-games_sim//points))
+    shoes = np.arange(stride, games_sim + 1, stride)
+    if shoes.size == 0 or shoes[-1] != games_sim:
+        shoes = np.append(shoes, games_sim)  # always end on the last shoe
+    return shoes
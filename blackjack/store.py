@@ -0,0 +1,196 @@
+# Append-only columnar store for per-shoe sweep results, so a sweep can be
+# plotted and analysed again without playing it again.
+#
+# A store is a directory of chunks. Every chunk is a directory with one .npy
+# file per column (all the same length, fixed width types) and a meta.json
+# with the settings of the sweep that wrote it. Chunks are written to a
+# temporary name and renamed when complete, so a store only ever has whole
+# chunks in it. Reading memory maps the columns a chunk at a time, nothing
+# has to fit in memory.
+#
+#   sweep(..., store='results/')        # or python -m blackjack --store results/
+#   results, shoes = curves('results/')
+#   plot_results(results, shoes)
+
+import json
+import os
+
+import numpy as np
+
+from .counting import STRATEGIES
+from .stats import RunningStats, curve_shoes
+
+# name: type of every column, one row per shoe and strategy
+COLUMNS = {
+    'strategy': np.int8,          # index into the store's strategy names
+    'seed': np.int64,             # master seed of the sweep
+    'shoe': np.int64,             # shoe number in the sweep, from 0
+    'rounds': np.int16,
+    'wins': np.int16,
+    'losses': np.int16,
+    'draws': np.int16,
+    'last': np.int16,             # wins and draws in the last rec_rounds rounds
+    'running_count': np.float32,  # counts after the last round
+    'true_count': np.float32,
+}
+CHUNK_ROWS = 1 << 20
+
+
+def _chunk_names(path):
+    return sorted(name for name in os.listdir(path) if name.startswith('chunk-'))
+
+
+# Buffers rows and writes them out a chunk at a time. settings is saved with
+# every chunk (the sweep's limit, number_decks, rec_rounds and so on)
+class StoreWriter:
+    def __init__(self, path, settings=None, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.settings = dict(settings or {})
+        self.chunk_rows = chunk_rows
+        self.buffer = {name: [] for name in COLUMNS}
+        self.buffered = 0
+        os.makedirs(path, exist_ok=True)
+        index = os.path.join(path, 'store.json')
+        if not os.path.exists(index):
+            with open(index, 'w') as f:
+                json.dump({'strategies': list(STRATEGIES),
+                           'columns': {name: np.dtype(t).str for name, t in COLUMNS.items()}}, f, indent=2)
+        with open(index) as f:
+            self.strategies = json.load(f)['strategies']
+
+    # Add rows, every column in COLUMNS as an array (or a single value for all rows)
+    def append(self, **columns):
+        rows = max(np.size(v) for v in columns.values())
+        for name, dtype in COLUMNS.items():
+            self.buffer[name].append(np.broadcast_to(np.asarray(columns[name], dtype=dtype), (rows,)))
+        self.buffered += rows
+        if self.buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        name = f"chunk-{len(_chunk_names(self.path)):06d}"
+        temp = os.path.join(self.path, '.' + name + '.tmp')
+        os.makedirs(temp, exist_ok=True)
+        for column, parts in self.buffer.items():
+            np.save(os.path.join(temp, column + '.npy'), np.concatenate(parts))
+            parts.clear()
+        with open(os.path.join(temp, 'meta.json'), 'w') as f:
+            json.dump(dict(self.settings, rows=self.buffered), f, indent=2)
+        os.rename(temp, os.path.join(self.path, name))
+        self.buffered = 0
+
+    # Chunks in the store so far
+    @property
+    def chunks(self):
+        return len(_chunk_names(self.path))
+
+    # Drop the chunks after the first chunks ones (and any half written one),
+    # a resumed sweep writes them again
+    def rollback(self, chunks):
+        import shutil
+        for name in os.listdir(self.path):
+            if name.endswith('.tmp') or (name.startswith('chunk-') and int(name[6:]) >= chunks):
+                shutil.rmtree(os.path.join(self.path, name))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Read side of a store, columns come back memory mapped chunk by chunk
+class StoreReader:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'store.json')) as f:
+            self.strategies = json.load(f)['strategies']
+        self.chunks = _chunk_names(path)
+
+    def meta(self, chunk):
+        with open(os.path.join(self.path, chunk, 'meta.json')) as f:
+            return json.load(f)
+
+    def __len__(self):
+        return sum(self.meta(chunk)['rows'] for chunk in self.chunks)
+
+    # Yields (meta, {column: memory mapped array}) for every chunk
+    def iter_chunks(self, columns=None):
+        for chunk in self.chunks:
+            yield self.meta(chunk), {name: np.load(os.path.join(self.path, chunk, name + '.npy'), mmap_mode='r')
+                                     for name in (columns or COLUMNS)}
+
+    # A whole column in memory, only for stores that fit
+    def read(self, name):
+        parts = [data[name] for _, data in self.iter_chunks([name])]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=COLUMNS[name])
+
+
+def _reader(store):
+    return store if isinstance(store, StoreReader) else StoreReader(store)
+
+# Rows of a chunk for one strategy (and seed if given), in the order written
+def _rows(data, code, seed):
+    keep = data['strategy'] == code
+    if seed is not None:
+        keep &= data['seed'] == seed
+    return keep
+
+
+# The sweep's results dict from a store: cumulative percentage of wins and
+# draws in the last rec_rounds of every shoe, at curve_shoes(shoes, points).
+# Returns the results and {strategy: shoe number of every point}, strategies
+# appended by different sweeps can have different numbers of shoes
+def curves(store, curve_points=None, seed=None):
+    reader = _reader(store)
+    shoes = {}
+    for _, data in reader.iter_chunks(['strategy', 'seed']):
+        for code in np.unique(data['strategy']):
+            shoes[code] = shoes.get(code, 0) + int(_rows(data, code, seed).sum())
+
+    results, points = {}, {}
+    for code, n in shoes.items():
+        points[code] = curve_shoes(n, curve_points)
+        results[reader.strategies[code]] = []
+    done = dict.fromkeys(shoes, 0)
+    wins = dict.fromkeys(shoes, 0)
+    for meta, data in reader.iter_chunks(['strategy', 'seed', 'last']):
+        for code in np.unique(data['strategy']):
+            last = data['last'][_rows(data, code, seed)]
+            total = wins[code] + np.cumsum(last, dtype=np.int64)
+            start = done[code]
+            first, end = np.searchsorted(points[code], (start, start + len(last)), side='right')
+            at = points[code][first:end]
+            results[reader.strategies[code]].extend(
+                np.round(total[at - start - 1]/(meta['rec_rounds']*at)*100, 4).tolist())
+            wins[code] = int(total[-1]) if len(total) else wins[code]
+            done[code] += len(last)
+    return results, {reader.strategies[code]: shoes for code, shoes in points.items()}
+
+# Running stats of every strategy's per-shoe win and draw rate in its last
+# rec_rounds, the same ones the sweep reports
+def strategy_stats(store, seed=None):
+    reader = _reader(store)
+    stats = {}
+    for meta, data in reader.iter_chunks(['strategy', 'seed', 'last']):
+        for code in np.unique(data['strategy']):
+            name = reader.strategies[code]
+            stats.setdefault(name, RunningStats()).add_many(data['last'][_rows(data, code, seed)]/meta['rec_rounds'])
+    return stats
+
+# Total wins, losses, draws and rounds of every strategy
+def totals(store, seed=None):
+    reader = _reader(store)
+    sums = {}
+    for _, data in reader.iter_chunks(['strategy', 'seed', 'rounds', 'wins', 'losses', 'draws']):
+        for code in np.unique(data['strategy']):
+            keep = _rows(data, code, seed)
+            tally = sums.setdefault(reader.strategies[code], dict.fromkeys(('rounds', 'wins', 'losses', 'draws'), 0))
+            for name in tally:
+                tally[name] += int(data[name][keep].sum(dtype=np.int64))
+    return sums
@@ -0,0 +1,186 @@
+# Strategy sweep split into work units that can run on a process pool.
+# Shoes are dealt in fixed size blocks and every block gets its own seed from
+# the master seed, so the results only depend on the seed and not on how many
+# workers there are or which worker played which block.
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import instrument
+from .batch import last_rounds, play_strategies, tallies
+from .checkpoint import check_settings, dump_stats, load_checkpoint, load_stats, save_checkpoint
+from .counting import count_table
+from .shoes import block_rng, create_shoes
+from .stats import RunningStats, curve_shoes
+
+
+# Split the sweep into (strategies, block) units. With lockstep all the
+# strategies share a unit and play the same shoes together, otherwise there
+# is one unit per strategy (they still get the same shoes for a block)
+def work_units(strategies, games_sim, block_size=1000, lockstep=True):
+    blocks = range((games_sim + block_size - 1)//block_size)
+    groups = [tuple(strategies)] if lockstep else [(s,) for s in strategies]
+    return [(group, b) for b in blocks for group in groups]
+
+# Play one unit and return the wins and draws in the last rec_rounds of
+# every shoe as 'last', one row per strategy in the unit. With records the
+# per-shoe columns the result store keeps are returned as well. With a
+# shoe_pool the block's shoes are read from it instead of being shuffled
+@instrument.probe('work unit')
+def run_unit(unit, games_sim, limit=16, rec_rounds=10, number_decks=6, cut=12,
+             seed=0, block_size=1000, records=False, shoe_pool=None):
+    strategies, block = unit
+    start = block*block_size
+    count = min(block_size, games_sim - start)
+    if shoe_pool is None:
+        shoes = create_shoes(count, number_decks, block_rng(seed, block))
+    else:
+        shoes = shoe_pool.shoes[start:start + count]
+    played = play_strategies(shoes, limit, strategies, cut, record_counts=records)
+    part = {'last': np.array([last_rounds(played[s], rec_rounds) for s in strategies], dtype=np.int16)}
+    if records:
+        results = [played[s] for s in strategies]
+        part['rounds'] = np.array([r.rounds for r in results], dtype=np.int16)
+        for name, counts in zip(('wins', 'losses', 'draws'), zip(*(tallies(r) for r in results))):
+            part[name] = np.array(counts, dtype=np.int16)
+        # the counts blackjack() left after the last round of the shoe
+        last = part['rounds'][..., None].astype(np.int64) - 1
+        part['running_count'] = np.array([np.take_along_axis(r.running_count, last[i], axis=-1)[:, 0]
+                                          for i, r in enumerate(results)], dtype=np.float32)
+        part['true_count'] = np.array([np.take_along_axis(r.true_count, last[i], axis=-1)[:, 0]
+                                       for i, r in enumerate(results)], dtype=np.float32)
+    return part
+
+
+# Run the whole sweep and return the same results dict the plotting cell
+# uses: the cumulative percentage of wins and draws after every shoe (or
+# after the shoes in curve_shoes(games_sim, curve_points) to keep it small).
+# Each strategy keeps its own tally. Blocks are folded in as they finish,
+# report(stats, shoes_done) is called after each one with the running mean
+# and variance of every strategy's per-shoe win and draw rate. With store
+# (a directory, see store.py) every shoe's record is appended to it.
+# With checkpoint (a file) the sweep saves where it is every
+# checkpoint_seconds, and resume=True carries on from that file if it is
+# there (report is called once with what it had). shoe_pool (a
+# shoes.ShoePool, shared with the workers) plays its shoes instead of
+# shuffling new ones, ShoePool.for_sweep gives the same shoes as without.
+# The blocks' seeds only depend on seed, so a resumed sweep gives exactly
+# the results of one that never stopped
+def sweep(strategies=None, games_sim=1000, limit=16, rec_rounds=10, number_decks=6,
+          cut=12, seed=0, workers=None, block_size=1000, lockstep=True,
+          curve_points=None, report=None, store=None, checkpoint=None, resume=False,
+          checkpoint_seconds=60, shoe_pool=None):
+    strategies = list(count_table()[0] if strategies is None else strategies)
+    if shoe_pool is not None and (shoe_pool.number_decks != number_decks or len(shoe_pool) < games_sim):
+        raise ValueError(f"the shoe pool has {len(shoe_pool)} shoes of {shoe_pool.number_decks} decks, "
+                         f"the sweep needs {games_sim} of {number_decks}")
+    units = work_units(strategies, games_sim, block_size, lockstep)
+    settings = dict(games_sim=games_sim, limit=limit, rec_rounds=rec_rounds,
+                    number_decks=number_decks, cut=cut, seed=seed, block_size=block_size)
+
+    points = curve_shoes(games_sim, curve_points)
+    results = {f"{s}": [] for s in strategies}
+    stats = {s: RunningStats() for s in strategies}
+    wins = dict.fromkeys(strategies, 0)
+    done = dict.fromkeys(strategies, 0)
+    finished = 0  # units folded in so far
+    store_chunks = None
+
+    run = dict(settings, strategies=strategies, lockstep=lockstep, curve_points=curve_points)
+    if resume and checkpoint is not None and os.path.exists(checkpoint):
+        state, results = load_checkpoint(checkpoint)
+        check_settings(state, run)
+        finished, wins, done = state['units'], state['wins'], state['done']
+        stats = load_stats(state['stats'])
+        store_chunks = state['store_chunks']
+        if report is not None:
+            report(stats, done)
+
+    writer = None
+    if store is not None:
+        from .store import StoreWriter
+        writer = StoreWriter(store, settings)
+        if store_chunks is not None:
+            # records written after the checkpoint get played again
+            writer.rollback(store_chunks)
+        settings['records'] = True
+    if shoe_pool is not None:
+        settings['shoe_pool'] = shoe_pool
+
+    def save():
+        if writer is not None:
+            writer.flush()
+        save_checkpoint(checkpoint, {'settings': run, 'units': finished, 'wins': wins, 'done': done,
+                                     'stats': dump_stats(stats),
+                                     'store_chunks': None if writer is None else writer.chunks}, results)
+
+    pool = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    saved = time.monotonic()
+    try:
+        todo = units[finished:]
+        if pool is None:
+            parts = (run_unit(unit, **settings) for unit in todo)
+        else:
+            parts = _in_order(pool, todo, settings, 2*(workers or os.cpu_count() or 1))
+
+        # Units come back in order so every strategy sees its blocks in order
+        for (group, block), part in zip(todo, parts):
+            if instrument.enabled:
+                instrument.start('result recording')
+            if writer is not None:
+                _append(writer, group, block*block_size, seed, part)
+            for s, row in zip(group, part['last']):
+                start = done[s]
+                total = wins[s] + np.cumsum(row, dtype=np.int64)
+                # points is sorted, only the ones inside this block are looked at
+                first, end = np.searchsorted(points, (start, start + len(row)), side='right')
+                shoes = points[first:end]
+                results[f"{s}"].extend(np.round(total[shoes - start - 1]/(rec_rounds*shoes)*100, 4).tolist())
+                wins[s] = int(total[-1])
+                done[s] += len(row)
+                stats[s].add_many(row/rec_rounds)
+            finished += 1
+            if instrument.enabled:
+                instrument.stop()
+            if checkpoint is not None and time.monotonic() - saved >= checkpoint_seconds:
+                save()
+                saved = time.monotonic()
+            if report is not None:
+                report(stats, done)
+        if checkpoint is not None:
+            save()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if writer is not None:
+            writer.close()
+    return results
+
+# Append a unit's per-shoe records to the store
+def _append(writer, group, first_shoe, seed, part):
+    shoes = np.arange(first_shoe, first_shoe + part['last'].shape[1])
+    for i, s in enumerate(group):
+        writer.append(strategy=writer.strategies.index(s), seed=seed, shoe=shoes,
+                      **{name: column[i] for name, column in part.items()})
+
+# A report function for sweep that prints the 95% interval of every strategy
+def print_report(stats, shoes_done):
+    for s, st in stats.items():
+        low, high = st.interval()
+        print(f"{s:<22}{shoes_done[s]:>10} shoes  {st.mean*100:8.4f}%  [{low*100:.4f}, {high*100:.4f}]")
+    print()
+
+# Results from the pool in unit order, with only a few units submitted at a
+# time so a sweep of any length holds the same number of blocks in memory
+def _in_order(pool, units, settings, ahead):
+    waiting = deque()
+    for unit in units:
+        waiting.append(pool.submit(run_unit, unit, **settings))
+        if len(waiting) >= ahead:
+            yield waiting.popleft().result()
+    while waiting:
+        yield waiting.popleft().result()
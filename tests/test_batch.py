@@ -0,0 +1,72 @@
+# The batch engine has to play every shoe exactly like blackjack() does,
+# round by round: same results, same counts after every round
+
+import numpy as np
+import pytest
+
+from blackjack import game
+from blackjack.batch import play_shoes, play_strategies
+from blackjack.cards import CARD_VALUES
+from blackjack.counting import strategy_weights
+from blackjack.shoes import create_shoes, decode_deck
+
+
+# Every round of one shoe with the scalar engine: results and counts
+def scalar_rounds(shoe, limit, strategy, cut=12):
+    deck = decode_deck(shoe)
+    running_count = true_count = 0
+    outcomes, running, true = [], [], []
+    while True:
+        wins, loss, draw, running_count, true_count = game.blackjack(deck, limit, running_count, true_count, strategy)
+        outcomes.append(0 if wins else 1 if loss else 2 if draw else -1)
+        running.append(running_count)
+        true.append(true_count)
+        if len(deck) < cut:
+            break
+    return outcomes, running, true
+
+
+@pytest.mark.parametrize('limit', [12, 16, 19])
+@pytest.mark.parametrize('strategy', game.STRATEGIES)
+def test_batch_matches_scalar(strategy, limit):
+    shoes = create_shoes(10, 6, np.random.default_rng(limit))
+    result = play_shoes(shoes, limit, strategy_weights(strategy), record_counts=True)
+    for i, shoe in enumerate(shoes):
+        outcomes, running, true = scalar_rounds(shoe, limit, strategy)
+        rounds = result.rounds[i]
+        assert rounds == len(outcomes)
+        assert result.outcome[i, :rounds].tolist() == outcomes
+        assert np.allclose(result.running_count[i, :rounds], running)
+        assert np.allclose(result.true_count[i, :rounds], true)
+
+
+# Playing the strategies in lockstep doesn't change what any of them gets
+def test_lockstep_matches_one_at_a_time():
+    shoes = create_shoes(50, 6, np.random.default_rng(0))
+    played = play_strategies(shoes, 16)
+    for strategy in game.STRATEGIES:
+        alone = play_shoes(shoes, 16, strategy_weights(strategy))
+        assert np.array_equal(played[strategy].outcome, alone.outcome)
+        assert np.array_equal(played[strategy].rounds, alone.rounds)
+
+
+# Only a two card 21 against a dealer without one is a natural, not a hand
+# that hit and got back to 21 by turning an Ace into a one
+@pytest.mark.parametrize('limit', [16, 21])
+def test_naturals_are_two_card_21s(limit):
+    strategy = 'KO'
+    shoes = create_shoes(100, 6, np.random.default_rng(13))
+    result = play_shoes(shoes, limit, strategy_weights(strategy), record_counts=True)
+    for i, shoe in enumerate(shoes):
+        deck = decode_deck(shoe)
+        running_count = true_count = 0
+        naturals = []
+        while True:
+            # blackjack() deals the player deck[-1] and deck[-2], the dealer the next two
+            player = CARD_VALUES[deck[-1]] + CARD_VALUES[deck[-2]]
+            dealer = CARD_VALUES[deck[-3]] + CARD_VALUES[deck[-4]]
+            naturals.append(player == 21 and dealer < 21)
+            *_, running_count, true_count = game.blackjack(deck, limit, running_count, true_count, strategy)
+            if len(deck) < 12:
+                break
+        assert result.naturals[i, :result.rounds[i]].tolist() == naturals
@@ -0,0 +1,22 @@
+# The command line entry point
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# The scalar engine without a checkpoint only needs the standard library
+def test_scalar_run_doesnt_load_numpy():
+    code = ("import sys; from blackjack.cli import main; "
+            "main(['--engine', 'scalar', '--shoes', '5', '--strategies', 'KO']); "
+            "sys.exit('numpy' in sys.modules)")
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True)
+
+
+# Curves keep a fixed number of points unless every shoe is asked for
+def test_curve_points_default():
+    from blackjack.cli import parse_args
+    assert parse_args([]).curve_points == 1000
+    assert parse_args(['--curve-points', '0']).curve_points is None
@@ -0,0 +1,34 @@
+# compare() with strategies that play exactly alike and the worker count
+
+import math
+
+from blackjack.compare import compare, main
+from blackjack.counting import STRATEGIES
+
+# Red 7 counts every card the way Hi-Lo does
+BASELINE, TWIN = 'Hi-Lo (Most Common)', 'Red 7'
+
+
+def test_strategies_are_twins():
+    assert STRATEGIES[BASELINE] == STRATEGIES[TWIN]
+
+
+def test_baseline_with_a_twin():
+    results = compare([TWIN, 'KO', 'No Strategy'], BASELINE, games_sim=600, block_size=200,
+                      control_mean=0.517, sequential=True)
+    twin = results[TWIN]
+    assert twin['difference'] == 0 and twin['diff low'] == twin['diff high'] == 0
+    assert math.isinf(twin['paired gain'])
+    assert twin['cv mean'] == results[BASELINE]['cv mean']
+    assert math.isfinite(results['KO']['paired gain'])
+
+
+def test_cli_with_a_twin(capsys):
+    assert main(['--baseline', BASELINE, '--strategies', TWIN, '--shoes', '300', '--block-size', '100',
+                 '--control-mean', '51.7']) == 0
+    assert 'identical' in capsys.readouterr().out
+
+
+def test_workers_give_the_same_results():
+    args = dict(strategies=['KO', 'Halves'], games_sim=900, block_size=100, sequential=True, min_shoes=200)
+    assert compare(workers=2, **args) == compare(workers=1, **args)
@@ -0,0 +1,13 @@
+# The counting values the engines use against the write-up's pickle
+
+import numpy as np
+import pytest
+
+from blackjack.counting import count_table, load_counts
+
+
+def test_strategies_match_the_pickle():
+    pytest.importorskip('pandas')
+    names, table = load_counts()
+    assert names == count_table()[0]
+    assert np.array_equal(table, count_table()[1])
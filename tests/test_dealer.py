@@ -0,0 +1,17 @@
+# Player decisions off the exact dealer distributions
+
+from blackjack.cards import ACE, RANKS
+from blackjack.dealer import composition, decision, hit_ev
+from blackjack.hand import Hand
+
+
+def test_two_aces_are_a_soft_twelve():
+    cards = list(range(len(RANKS)))*4
+    for card in (ACE, ACE, RANKS.index('10')):
+        cards.remove(card)
+    assert decision(Hand().add(ACE).add(ACE), 10, composition(cards)) == 'hit'
+
+
+# Soft 20 hitting an Ace is 31, the Ace turned into a one makes it 21
+def test_soft_bust_to_21_wins():
+    assert hit_ev(20, 1, 10, composition([ACE]*4)) == 1.0
@@ -0,0 +1,21 @@
+# exact.analyze is the ground truth for the first round of a fresh shoe,
+# the simulated first rounds have to land within a few standard errors
+
+import numpy as np
+
+from blackjack import exact
+from blackjack.batch import DRAW, LOSS, WIN, play_shoes
+from blackjack.counting import strategy_weights
+from blackjack.shoes import create_shoes
+
+
+def test_exact_matches_simulated_first_rounds():
+    strategy, limit, n = 'Hi-Lo (Most Common)', 16, 200000
+    probs = exact.analyze(limit, strategy, number_decks=1)
+    assert abs(sum(probs.values()) - 1) < 1e-12
+
+    shoes = create_shoes(n, 1, np.random.default_rng(8))
+    first = play_shoes(shoes, limit, strategy_weights(strategy)).outcome[:, 0]
+    for name, code in (('win', WIN), ('loss', LOSS), ('draw', DRAW)):
+        p = probs[name]
+        assert abs((first == code).mean() - p) < 4*np.sqrt(p*(1 - p)/n), name
@@ -0,0 +1,17 @@
+# Grid cells and their keys
+
+from blackjack.batch import MIN_CUT
+from blackjack.grid import expand, run_grid
+
+
+# A whole shoe dealt has no cards left at the cut, the engine stops at
+# MIN_CUT so that is the cell it gets, and only once
+def test_small_cuts_are_one_cell():
+    cells = expand(['KO'], [16], [1, 6], [10], 100, 0, 100, cuts=[0, 2, MIN_CUT])
+    assert sorted(cell[2:4] for cell in cells.values()) == [(1, MIN_CUT), (6, MIN_CUT)]
+    cells = expand(['KO'], [16], [1], [10], 100, 0, 100, penetrations=[0.99, 1.0])
+    assert [cell[3] for cell in cells.values()] == [MIN_CUT]
+
+def test_small_cut_plays_like_min_cut():
+    small = run_grid(['KO'], cuts=(1,), games_sim=200, block_size=100, workers=1)
+    assert small == run_grid(['KO'], cuts=(MIN_CUT,), games_sim=200, block_size=100, workers=1)
@@ -0,0 +1,71 @@
+# The full rules game on scripted shoes
+
+from blackjack.cards import RANK_CODE
+from blackjack.decisions import (HARD, HI_LO_DEVIATIONS, HIT, STAND, basic_table, decision_array,
+                                 tc_bucket)
+from blackjack.hand import Hand
+from blackjack.rules import RULES, decide, play_round
+
+STRATEGY = 'Hi-Lo (Most Common)'
+
+
+# A deck dealt in the order given: player, player, dealer's up card, hole
+# card, then every card drawn. Some twos go under it so the count has cards left
+def deck(*cards):
+    return [RANK_CODE['2']]*20 + [RANK_CODE[card] for card in reversed(cards)]
+
+def play(*cards, rules=RULES):
+    return play_round(deck(*cards), 0, STRATEGY, rules=rules)[:2]
+
+
+# 8,8 v 6: the first 8 draws a 3 and doubles to 21, the second stands on 18
+# and the dealer busts 16
+def test_split_then_double():
+    assert play('8', '8', '6', '10', '3', '10', '10', '10') == [3.0, 3.0]
+
+def test_no_double_after_split_hits():
+    rules = RULES._replace(double_after_split=False)
+    assert play('8', '8', '6', '10', '3', '10', '10', '10', rules=rules) == [2.0, 2.0]
+
+# The first 8 draws another 8 and splits again, three hands of 18
+def test_resplit():
+    assert play('8', '8', '6', '10', '8', '10', '10', '10', '10') == [3.0, 3.0]
+
+# With two hands at most the 8,8 stays a 16 and stands against the 6
+def test_max_hands():
+    rules = RULES._replace(max_hands=2)
+    assert play('8', '8', '6', '10', '8', '10', '10', rules=rules) == [2.0, 2.0]
+
+# Split Aces take one card each, soft 16 and a pair of Aces included
+def test_split_aces_one_card_each():
+    assert play('A', 'A', '6', '10', '5', 'A', '10') == [2.0, 2.0]
+
+def test_surrender():
+    assert play('10', '6', '10', '7') == [-0.5, 1.0]
+
+def test_no_surrender_hits():
+    rules = RULES._replace(surrender=False)
+    assert play('10', '6', '10', '7', '4', rules=rules) == [1.0, 1.0]
+
+# Three card 11 v 6 can't double and hits, three card soft 18 v 3 stands
+def test_double_falls_back():
+    assert play('2', '4', '6', '10', '5', '10', '10') == [1.0, 1.0]
+    assert play('A', '2', '3', '10', '5', '10') == [1.0, 1.0]
+
+# The dealer peeks: their natural takes one bet before the player plays
+def test_peek():
+    assert play('10', '9', 'A', '10') == [-1.0, 1.0]
+    assert play('A', '10', '9', '7') == [1.5, 1.0]
+    assert play('A', '10', '10', 'A') == [0.0, 1.0]
+
+
+# 12 v 2 stands from a true count of +3 on, counts past the ends use the end bucket
+def test_deviation_buckets():
+    table = basic_table(HI_LO_DEVIATIONS)
+    hand = Hand().add(RANK_CODE['10']).add(RANK_CODE['2'])
+    two = RANK_CODE['2']
+    assert decide(hand, two, 0, 1, RULES, table, 2.9) == HIT
+    assert decide(hand, two, 0, 1, RULES, table, 3.0) == STAND
+    assert decide(hand, two, 0, 1, RULES, table, 12.0) == STAND
+    assert decide(hand, two, 0, 1, RULES, basic_table(), 12.0) == HIT
+    assert decision_array(HI_LO_DEVIATIONS)[tc_bucket(3.5), 0, HARD, 12, two] == STAND
@@ -0,0 +1,55 @@
+# A sweep written to a result store reads back as the same results
+
+import numpy as np
+
+from blackjack.batch import play_strategies, tallies
+from blackjack.cli import main
+from blackjack.shoes import block_rng, create_shoes
+from blackjack.store import StoreReader, curves, strategy_stats, totals
+from blackjack.sweep import sweep
+
+STRATEGIES = ['Hi-Lo (Most Common)', 'KO']
+
+
+def run(store, strategies=STRATEGIES, games_sim=300, **kwargs):
+    stats = {}
+    results = sweep(strategies, games_sim, rec_rounds=10, seed=5, block_size=100, store=store,
+                    report=lambda st, done: stats.update(st), **kwargs)
+    return results, stats
+
+
+def test_round_trip(tmp_path):
+    store = str(tmp_path/'store')
+    results, stats = run(store)
+    assert len(StoreReader(store)) == 300*len(STRATEGIES)
+
+    read, shoes = curves(store)
+    assert read == results
+    assert all(shoes[s].tolist() == list(range(1, 301)) for s in STRATEGIES)
+    assert curves(store, 20)[0] == run(str(tmp_path/'short'), curve_points=20)[0]
+
+    read = strategy_stats(store)
+    for s in STRATEGIES:
+        assert read[s].count == stats[s].count
+        assert np.isclose(read[s].mean, stats[s].mean) and np.isclose(read[s].m2, stats[s].m2)
+
+    # tallies of the same shoes played again
+    played = {s: [0, 0, 0, 0] for s in STRATEGIES}
+    for block in range(3):
+        shoes = create_shoes(100, 6, block_rng(5, block))
+        for s, result in play_strategies(shoes, 16, STRATEGIES).items():
+            counts = [result.rounds.sum()] + [t.sum() for t in tallies(result)]
+            played[s] = [a + int(b) for a, b in zip(played[s], counts)]
+    assert {s: list(t.values()) for s, t in totals(store).items()} == played
+
+
+# Sweeps with different strategies and lengths appended to one store
+def test_appended_sweeps_plot(tmp_path):
+    store = str(tmp_path/'store')
+    run(store, ['KO'], 300)
+    run(store, ['Halves', 'No Strategy'], 500, workers=1)
+    results, shoes = curves(store)
+    assert {s: len(r) for s, r in results.items()} == {'KO': 300, 'Halves': 500, 'No Strategy': 500}
+    assert all(len(shoes[s]) == len(results[s]) for s in results)
+    assert main(['--from-store', store, '--plot', str(tmp_path/'plot.png')]) == 0
+    assert (tmp_path/'plot.png').exists()
@@ -0,0 +1,41 @@
+# A sweep's results only depend on its seed, not on how it was run
+
+from blackjack.checkpoint import load_checkpoint
+from blackjack.sweep import sweep
+
+STRATEGIES = ['Hi-Lo (Most Common)', 'KO', 'No Strategy']
+SETTINGS = dict(games_sim=500, limit=16, rec_rounds=10, seed=4, block_size=100)
+
+
+def run(**kwargs):
+    stats = {}
+    results = sweep(STRATEGIES, report=lambda st, done: stats.update(st), **dict(SETTINGS, **kwargs))
+    return results, {s: (st.count, st.mean, st.m2) for s, st in stats.items()}
+
+
+def test_workers_give_the_same_results():
+    one = run(workers=1)
+    assert run(workers=2) == one
+    assert run(workers=3, lockstep=False) == one
+
+
+class Stop(Exception):
+    pass
+
+
+def test_resume_matches_an_uninterrupted_run(tmp_path):
+    checkpoint = str(tmp_path/'sweep.npz')
+    calls = []
+
+    # stop the sweep after its second block, a checkpoint is saved after every block
+    def stop_early(stats, done):
+        calls.append(1)
+        if len(calls) == 2:
+            raise Stop
+
+    try:
+        sweep(STRATEGIES, report=stop_early, checkpoint=checkpoint, checkpoint_seconds=0, **SETTINGS)
+    except Stop:
+        pass
+    assert load_checkpoint(checkpoint)[0]['units'] == 2
+    assert run(checkpoint=checkpoint, resume=True) == run()